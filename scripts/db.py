@@ -37,7 +37,7 @@ def get_engine(env_var_name: str, fallback_db_url: str):
     if url in _engine_cache:
         return _engine_cache[url]
 
-    if url == 'sqlite:///:memory:':
+    if url == 'sqlite:///:memory:' or 'mode=memory' in url:
         # Use StaticPool so the same in-memory DB is accessible across sessions and threads
         engine = create_engine(url, echo=False, connect_args={"check_same_thread": False}, poolclass=StaticPool)
     else:
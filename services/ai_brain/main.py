@@ -3,16 +3,19 @@ from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import uuid
+import asyncio
 import httpx
 import re
 import datetime
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 import base64
 from io import BytesIO
 import subprocess
 from shutil import which
 import json
 import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 # OpenAI removed - Kilo runs 100% locally with Ollama
 try:
     from gtts import gTTS
@@ -1100,32 +1103,134 @@ def serve_tts(fname: str):
     return FileResponse(str(path), media_type="audio/mpeg")
 
 
+# First flat {...} object in an LLM reply (prescription parsing)
+_JSON_OBJECT_RE = re.compile(r'\{[^}]+\}', re.DOTALL)
+
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# In-process Tesseract binding; avoids pytesseract's per-call subprocess,
+# temp-file round-trip and tessdata load. Optional - pytesseract is the fallback.
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+# PyTessBaseAPI is not thread-safe, so each _ocr_band_pool thread keeps its own;
+# all OCR runs on that pool, so at most its max_workers APIs stay resident
+_tess_local = threading.local()
+
+
+def _tess_api():
+    api = getattr(_tess_local, "api", None)
+    if api is None:
+        kwargs = {"psm": tesserocr.PSM.AUTO}
+        if os.getenv("TESSDATA_PREFIX"):
+            kwargs["path"] = os.environ["TESSDATA_PREFIX"]
+        api = tesserocr.PyTessBaseAPI(**kwargs)
+        _tess_local.api = api
+    return api
+
+
+def _ocr_image(img) -> str:
+    # only call on _ocr_band_pool (see _tess_local)
+    if tesserocr is not None:
+        api = _tess_api()
+        api.SetImage(img)
+        return api.GetUTF8Text()
+    import pytesseract
+    return pytesseract.image_to_string(img)
+
+
+OCR_BAND_HEIGHT = 1000  # px; taller pages are split into bands at blank rows
+OCR_BLANK_ROW_MEAN = 245  # row mean brightness at or above which a row counts as blank
+# Tesseract releases the GIL (and pytesseract runs a subprocess), so bands OCR in parallel
+_ocr_band_pool = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1))
+
+
+def _band_ranges(img) -> List[tuple]:
+    """Split a tall grayscale page into (top, bottom) bands, cutting only on blank rows."""
+    width, height = img.size
+    if height <= OCR_BAND_HEIGHT:
+        return [(0, height)]
+    # BOX-resizing to one column gives each row's mean brightness
+    row_means = list(img.resize((1, height), Image.BOX).getdata())
+    ranges, top = [], 0
+    for y, mean in enumerate(row_means):
+        if y - top >= OCR_BAND_HEIGHT and mean >= OCR_BLANK_ROW_MEAN:
+            ranges.append((top, y))
+            top = y
+    ranges.append((top, height))
+    return ranges
+
+
+def _ocr_page(image_bytes: bytes) -> str:
+    """OCR a single page image; runs in a worker thread."""
+    img = Image.open(BytesIO(image_bytes))
+    # decode JPEGs straight to grayscale in libjpeg (no-op for other formats),
+    # then make sure tesseract gets a single-channel image either way
+    img.draft("L", img.size)
+    img = img.convert("L")
+    bands = _band_ranges(img)
+    if len(bands) == 1:
+        return _ocr_band_pool.submit(_ocr_image, img).result()
+    crops = [img.crop((0, top, img.width, bottom)) for top, bottom in bands]
+    return "\n".join(_ocr_band_pool.map(_ocr_image, crops))
+
+
+# Parsed prescription results keyed by SHA-256 of the uploaded page bytes, so a
+# re-upload of the same photo (e.g. a UI retry) skips OCR and the LLM call
+PRESCRIPTION_CACHE_SIZE = 256
+_prescription_cache: "OrderedDict[str, dict]" = OrderedDict()
+
+
+def _pages_digest(page_bytes: List[bytes]) -> str:
+    h = hashlib.sha256()
+    for b in page_bytes:
+        # length prefix keeps page boundaries part of the key
+        h.update(len(b).to_bytes(8, "little"))
+        h.update(b)
+    return h.hexdigest()
+
+
 @app.post("/analyze/prescription")
-async def analyze_prescription(image: UploadFile = File(...)):
+async def analyze_prescription(image: UploadFile = File(...), pages: List[UploadFile] = File(None)):
     """
     Analyze prescription image using OCR to extract medication information.
-    Supports single image uploads. Text from curved bottles can be captured.
+    Supports a single image plus optional extra `pages`; each page is OCR'd
+    separately (in parallel) and the text joined, rather than stitching pages
+    into one wide image. Text from curved bottles can be captured.
     Returns structured medication data that can be added to the medication schedule.
     """
     try:
         # Import OCR libraries
         try:
-            import pytesseract
+            if tesserocr is None:
+                import pytesseract
             from PIL import Image
         except ImportError as e:
             raise HTTPException(status_code=500, detail=f"OCR libraries not available: {e}")
 
-        # Read and process the image
-        image_bytes = await image.read()
-        pil_image = Image.open(BytesIO(image_bytes))
-        ocr_text = pytesseract.image_to_string(pil_image)
+        # Read and OCR each page
+        uploads = [image] + list(pages or [])
+        page_bytes = [await u.read() for u in uploads]
+        cache_key = _pages_digest(page_bytes)
+        cached = _prescription_cache.get(cache_key)
+        if cached is not None:
+            _prescription_cache.move_to_end(cache_key)
+            return dict(cached)
+        texts = await asyncio.gather(*(run_in_threadpool(_ocr_page, b) for b in page_bytes))
+        ocr_text = "\n".join(texts)
 
         if not ocr_text.strip():
             return {
                 "success": False,
                 "error": "No text detected in image. Please ensure the prescription is clearly visible and well-lit.",
                 "ocr_text": "",
-                "images_processed": 1
+                "images_processed": len(uploads)
             }
 
         # Use RAG/LLM to parse the prescription text
@@ -1157,8 +1262,7 @@ Return ONLY a JSON object with these fields. If a field is not found, use null."
             response_text = rag_result["response"]
 
             # Try to extract JSON from the response
-            import re
-            json_match = re.search(r'\{[^}]+\}', response_text, re.DOTALL)
+            json_match = _JSON_OBJECT_RE.search(response_text)
             if json_match:
                 parsed_data = json.loads(json_match.group())
             else:
@@ -1171,13 +1275,18 @@ Return ONLY a JSON object with these fields. If a field is not found, use null."
                     "instructions": response_text
                 }
 
-            return {
+            result = {
                 "success": True,
                 "ocr_text": ocr_text,
                 "parsed_data": parsed_data,
                 "ai_interpretation": response_text,
-                "images_processed": 1
+                "images_processed": len(uploads)
             }
+            # only fully parsed results are cached; failures should be retried
+            _prescription_cache[cache_key] = result
+            if len(_prescription_cache) > PRESCRIPTION_CACHE_SIZE:
+                _prescription_cache.popitem(last=False)
+            return dict(result)
 
         except Exception as e:
             # Fallback: return OCR text without AI parsing
@@ -1186,7 +1295,7 @@ Return ONLY a JSON object with these fields. If a field is not found, use null."
                 "ocr_text": ocr_text,
                 "parsed_data": None,
                 "error": f"AI parsing failed: {e}. Raw OCR text available.",
-                "images_processed": 1
+                "images_processed": len(uploads)
             }
 
     except Exception as e:
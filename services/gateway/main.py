@@ -5,6 +5,7 @@ from starlette.responses import JSONResponse
 import httpx
 import os
 from sqlmodel import SQLModel, Field, create_engine, Session, select
+from sqlalchemy.pool import StaticPool
 from typing import Optional
 import secrets
 import hashlib
@@ -28,7 +29,11 @@ app.add_middleware(
 
 # admin tokens DB (simple centralized token store for admin UI/automation)
 DB_URL = os.getenv("GATEWAY_DB_URL", "sqlite:////tmp/gateway.db")
-engine = create_engine(DB_URL, echo=False)
+if ':memory:' in DB_URL or 'mode=memory' in DB_URL:
+    # in-memory DBs (tests): one shared connection across sessions and threads
+    engine = create_engine(DB_URL, echo=False, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+else:
+    engine = create_engine(DB_URL, echo=False)
 
 
 class AdminToken(SQLModel, table=True):
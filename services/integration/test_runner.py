@@ -1,47 +1,123 @@
 import os
+import sys
 import time
-import json
+import orjson
+import shutil
 import signal
+import socket
+import functools
+import importlib.util
 import subprocess
 import threading
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
+import requests
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+
+# keep-alive session per thread for the runner's HTTP calls; requests.Session isn't
+# documented as thread-safe and the readiness polls run in parallel
+_local = threading.local()
+
+
+def _session():
+    s = getattr(_local, 'session', None)
+    if s is None:
+        s = requests.Session()
+        s.mount('http://', requests.adapters.HTTPAdapter(pool_connections=8, pool_maxsize=8))
+        _local.session = s
+    return s
+
 
 RECEIVED = []
+# path -> bodies received on that path, for direct lookup instead of scanning RECEIVED
+RECEIVED_BY_PATH = {}
+# set whenever the mock receives a POST so waiters wake without polling
+RECEIVED_EVENT = threading.Event()
 
 
-class MockHandler(BaseHTTPRequestHandler):
-    def do_POST(self):
+async def mock_sink(request):
+    try:
+        body = await request.body()
         try:
-            length = int(self.headers.get('content-length', 0))
-            body = self.rfile.read(length) if length else b''
-            try:
-                data = json.loads(body.decode())
-            except Exception:
-                data = body.decode()
-            RECEIVED.append({'path': self.path, 'headers': dict(self.headers), 'body': data})
-            self.send_response(200)
-            self.end_headers()
-            self.wfile.write(b'OK')
-        except Exception as e:
-            self.send_response(500)
-            self.end_headers()
-            self.wfile.write(str(e).encode())
+            # orjson parses the raw bytes directly, skipping the decode pass
+            data = orjson.loads(body)
+        except orjson.JSONDecodeError:
+            data = body.decode()
+        path = request.url.path
+        if request.url.query:
+            path = f'{path}?{request.url.query}'
+        RECEIVED.append({'path': path, 'headers': dict(request.headers), 'body': data})
+        RECEIVED_BY_PATH.setdefault(path, []).append(data)
+        RECEIVED_EVENT.set()
+        return PlainTextResponse('OK')
+    except Exception as e:
+        return PlainTextResponse(str(e), status_code=500)
 
 
-def start_mock_server(port=9000):
-    srv = HTTPServer(('0.0.0.0', port), MockHandler)
+mock_app = Starlette(routes=[Route('/{path:path}', mock_sink, methods=['POST'])])
+
+
+class MockServer:
+    """uvicorn-served mock sink running on a daemon thread.
+
+    Unlike HTTPServer it handles concurrent callbacks on the asyncio loop
+    rather than serializing them.
+    """
 
-    def run():
+    def __init__(self, port=9000):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(('0.0.0.0', port))
+        self.server_address = self.sock.getsockname()
+        self.server = uvicorn.Server(uvicorn.Config(mock_app, log_level='warning'))
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
         try:
-            srv.serve_forever()
+            self.server.run(sockets=[self.sock])
         except Exception:
             pass
 
-    t = threading.Thread(target=run, daemon=True)
-    t.start()
-    return srv
+    def start(self, timeout=5):
+        self.thread.start()
+        deadline = time.time() + timeout
+        while not self.server.started and self.thread.is_alive() and time.time() < deadline:
+            time.sleep(0.01)
+        return self
+
+    def shutdown(self):
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
+
+
+def start_mock_server(port=9000):
+    return MockServer(port).start()
+
+
+@functools.lru_cache(maxsize=None)
+def _uvicorn_cmd():
+    # Prefer invoking uvicorn with the same Python interpreter so the child
+    # process sees the same site-packages and PYTHONPATH; fall back to the
+    # global uvicorn command if the module is not importable here.
+    if importlib.util.find_spec('uvicorn') is not None:
+        return [sys.executable, '-m', 'uvicorn']
+    return ['uvicorn']
+
+
+def _port_in_use(port):
+    s = socket.socket()
+    s.settimeout(0.05)
+    try:
+        return s.connect_ex(('127.0.0.1', int(port))) == 0
+    except Exception:
+        return False
+    finally:
+        s.close()
 
 
 def start_service(module_spec, port, extra_env=None):
@@ -59,8 +135,7 @@ def start_service(module_spec, port, extra_env=None):
     env['PYTHONPATH'] = os.pathsep.join(parts)
     if extra_env:
         env.update(extra_env)
-    cmd = [
-        'uvicorn',
+    cmd = _uvicorn_cmd() + [
         f'{module_spec}:app',
         '--host', '0.0.0.0',
         '--port', str(port),
@@ -68,16 +143,10 @@ def start_service(module_spec, port, extra_env=None):
     ]
     # If port is already in use, try to identify and terminate any process
     # listening on it to avoid flakiness in CI where a previous test run
-    # may have left a server running.
-    try:
-        import socket
-        s = socket.socket()
-        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        s.bind(('0.0.0.0', int(port)))
-        s.close()
-    except Exception:
+    # may have left a server running. A quick connect probe is enough to
+    # tell; lsof is only consulted when something is actually listening.
+    if _port_in_use(port):
         try:
-            # try to find processes with lsof and kill them
             res = subprocess.check_output(['lsof', '-t', f'-i:{port}']).decode().strip()
             pids = [int(x) for x in res.split() if x.strip()]
             for pid in pids:
@@ -89,56 +158,54 @@ def start_service(module_spec, port, extra_env=None):
             # best effort only; continue to start the service and let it fail if port truly in use
             pass
 
-    # ensure no stale compiled bytecode interferes
-    try:
+    # optionally clear stale compiled bytecode; walking the whole tree on every
+    # service start is expensive, so only do it when explicitly requested
+    if os.environ.get('INTEGRATION_CLEAN_PYCACHE') == '1':
         for root, dirs, files in os.walk(micro_dir):
             if '__pycache__' in dirs:
-                try:
-                    import shutil
-                    shutil.rmtree(os.path.join(root, '__pycache__'))
-                except Exception:
-                    pass
-    except Exception:
-        pass
+                shutil.rmtree(os.path.join(root, '__pycache__'), ignore_errors=True)
 
-    # Prefer invoking uvicorn with the same Python interpreter to ensure
-    # the child process sees the same site-packages and PYTHONPATH.
+    # own session/process group so teardown can kill any reloader/worker children too
+    p = subprocess.Popen(cmd, env=env, cwd=micro_dir, start_new_session=True)
+    return p
+
+
+def stop_service(p, timeout=2):
+    """Terminate a service started by start_service along with its process group."""
+    try:
+        pgid = os.getpgid(p.pid)
+    except ProcessLookupError:
+        return
     try:
-        import sys
-        # If the current Python has uvicorn importable, prefer running it via
-        # `python -m uvicorn` so it uses the same site-packages and PYTHONPATH.
+        os.killpg(pgid, signal.SIGTERM)
+        p.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
         try:
-            subprocess.check_call([sys.executable, '-c', 'import uvicorn'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            cmd = [sys.executable, '-m', 'uvicorn', f'{module_spec}:app', '--host', '0.0.0.0', '--port', str(port), '--log-level', 'warning']
-        except Exception:
-            # fallback to global uvicorn command if module not importable
-            cmd = ['uvicorn', f'{module_spec}:app', '--host', '0.0.0.0', '--port', str(port), '--log-level', 'warning']
-    except Exception:
-        # ultimate fallback
-        cmd = ['uvicorn', f'{module_spec}:app', '--host', '0.0.0.0', '--port', str(port), '--log-level', 'warning']
-
-    p = subprocess.Popen(cmd, env=env, cwd=micro_dir)
-    return p
+            os.killpg(pgid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    except ProcessLookupError:
+        pass
 
 
 def wait_for(url, timeout=15):
-    import requests
-
     start = time.time()
+    # poll quickly at first and back off, so a fast-booting service is seen
+    # almost immediately without hammering a slow one
+    delay = 0.01
     while time.time() - start < timeout:
         try:
-            r = requests.get(url, timeout=1)
+            r = _session().get(url, timeout=0.5)
             if r.status_code < 500:
                 return True
         except Exception:
             pass
-        time.sleep(0.5)
+        time.sleep(delay)
+        delay = min(delay * 1.5, 0.2)
     return False
 
 
 def run_integration():
-    import requests
-
     mock = start_mock_server(0)
     mock_port = mock.server_address[1]
     procs = []
@@ -152,10 +219,10 @@ def run_integration():
         # point financial outgoing posts at the mock server so we can assert the payloads; unset ADMIN_TOKEN and use separate DB
         financial_db = 'sqlite:////tmp/financial_integration.db'
         procs.append(start_service('microservice.financial.main', 8003, extra_env={'AI_BRAIN_URL': f'http://127.0.0.1:{mock_port}/ingest/finance', 'ADMIN_TOKEN': '', 'FINANCIAL_DB_URL': financial_db}))
-        # wait for readiness
-        ok = wait_for('http://127.0.0.1:8001/status', timeout=20)
-        ok &= wait_for('http://127.0.0.1:8002/status', timeout=20)
-        ok &= wait_for('http://127.0.0.1:8003/status', timeout=20)
+        # wait for readiness of all services in parallel so warmup costs max() not sum()
+        status_urls = [f'http://127.0.0.1:{port}/status' for port in (8001, 8002, 8003)]
+        with ThreadPoolExecutor(len(status_urls)) as ex:
+            ok = all(ex.map(lambda u: wait_for(u, timeout=20), status_urls))
         if not ok:
             print('One or more services failed to start')
             return 2
@@ -164,21 +231,15 @@ def run_integration():
 
         # Test: create a reminder and verify callback reaches mock server
         when = (datetime.utcnow() + timedelta(seconds=1)).isoformat()
-        r = requests.post('http://127.0.0.1:8001/', json={'text': 'integration test', 'when': when})
+        r = _session().post('http://127.0.0.1:8001/', json={'text': 'integration test', 'when': when})
         if r.status_code != 200:
             print('Failed to create reminder', r.status_code, r.text)
             failures += 1
         else:
             rid = r.json().get('id')
-            requests.post(f'http://127.0.0.1:8001/{rid}/trigger')
+            _session().post(f'http://127.0.0.1:8001/{rid}/trigger')
             # wait for mock callback
-            start = time.time()
-            seen = False
-            while time.time() - start < 10:
-                if RECEIVED:
-                    seen = True
-                    break
-                time.sleep(0.2)
+            seen = bool(RECEIVED) or RECEIVED_EVENT.wait(timeout=10)
             if not seen:
                 print('Callback not received by mock server')
                 failures += 1
@@ -191,18 +252,19 @@ def run_integration():
             'description': 'integration-transaction',
             'date': datetime.utcnow().isoformat()
         }
-        rtx = requests.post('http://127.0.0.1:8003/', json=tx)
+        rtx = _session().post('http://127.0.0.1:8003/', json=tx)
         if rtx.status_code != 200:
             print('Failed to create financial transaction', rtx.status_code, rtx.text)
             failures += 1
         else:
             # verify transaction persisted locally
-            lst = requests.get('http://127.0.0.1:8003/').json()
-            if not any(t.get('amount') == tx['amount'] and t.get('description') == tx['description'] for t in lst):
+            lst = _session().get('http://127.0.0.1:8003/').json()
+            seen_tx = {(t.get('amount'), t.get('description')) for t in lst}
+            if (tx['amount'], tx['description']) not in seen_tx:
                 print('Transaction not found in financial list')
                 failures += 1
             # verify mock received the outgoing post to /ingest/finance
-            found = any(r['path'].endswith('/ingest/finance') and isinstance(r['body'], dict) and r['body'].get('amount') == tx['amount'] for r in RECEIVED)
+            found = any(isinstance(b, dict) and b.get('amount') == tx['amount'] for b in RECEIVED_BY_PATH.get('/ingest/finance', []))
             if not found:
                 print('financial outgoing POST to AI_BRAIN not observed in mock')
                 failures += 1
@@ -212,7 +274,7 @@ def run_integration():
         # Test: simple status endpoints
         for port in (8001, 8002, 8003):
             try:
-                rr = requests.get(f'http://127.0.0.1:{port}/status', timeout=2)
+                rr = _session().get(f'http://127.0.0.1:{port}/status', timeout=2)
                 if rr.status_code != 200:
                     print(f'status check failed for port {port}')
                     failures += 1
@@ -229,7 +291,7 @@ def run_integration():
             pass
         for p in procs:
             try:
-                p.terminate()
+                stop_service(p)
             except Exception:
                 pass
 
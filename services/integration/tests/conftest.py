@@ -0,0 +1,33 @@
+import os
+import uuid
+
+import pytest
+from sqlmodel import SQLModel
+
+
+@pytest.fixture
+def memory_db_url():
+    """Factory for named shared-cache in-memory SQLite URLs, unique per call.
+
+    Each test gets fresh databases with no file creation/fsync under /tmp; the
+    services put these URLs on a StaticPool so all sessions share one connection.
+    """
+    def make(name):
+        return f"sqlite:///file:{name}_{os.getpid()}_{uuid.uuid4().hex[:8]}?mode=memory&cache=shared&uri=true"
+    return make
+
+
+@pytest.fixture
+def create_tables():
+    """Create all SQLModel tables (plus any explicitly given ones) on an engine."""
+    def create(engine, *tables):
+        try:
+            SQLModel.metadata.create_all(engine)
+        except Exception:
+            pass
+        for table in tables:
+            try:
+                table.create(engine, checkfirst=True)
+            except Exception:
+                pass
+    return create
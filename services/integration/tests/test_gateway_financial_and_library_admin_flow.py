@@ -25,17 +25,14 @@ def reload_module(module_path, env_overrides=None):
 
 
 @pytest.mark.skipif(os.environ.get('RUN_INTEGRATION') != '1', reason="Integration test - set RUN_INTEGRATION=1 to run")
-def test_gateway_financial_and_library_admin_flow():
-    gw_db = f"sqlite:////tmp/gateway_it_{os.getpid()}_{int(time.time()*1000)}.db"
-    fin_db = f"sqlite:////tmp/financial_it_{os.getpid()}_{int(time.time()*1000)}.db"
-    lib_db = f"sqlite:////tmp/library_it_{os.getpid()}_{int(time.time()*1000)}.db"
+def test_gateway_financial_and_library_admin_flow(memory_db_url, create_tables):
+    gw_db = memory_db_url('gateway_it')
+    fin_db = memory_db_url('financial_it')
+    lib_db = memory_db_url('library_it')
 
     # start gateway
     gm = reload_module('microservice.gateway.main', {'GATEWAY_DB_URL': gw_db})
-    try:
-        SQLModel.metadata.create_all(gm.engine)
-    except Exception:
-        pass
+    create_tables(gm.engine)
     gw_client = TestClient(gm.app)
 
     # create admin token
@@ -56,10 +53,7 @@ def test_gateway_financial_and_library_admin_flow():
 
     # load financial service with isolated DB
     fm = reload_module('microservice.financial.main', {'FINANCIAL_DB_URL': fin_db})
-    try:
-        SQLModel.metadata.create_all(fm.engine)
-    except Exception:
-        pass
+    create_tables(fm.engine)
 
     # patch validator to use gateway DB directly
     import microservice.gateway.admin_client as admin_client
@@ -95,10 +89,7 @@ def test_gateway_financial_and_library_admin_flow():
 
     # load library_of_truth with isolated DB
     lm = reload_module('microservice.library_of_truth.main', {'LIBRARY_OF_TRUTH_DB_URL': lib_db})
-    try:
-        SQLModel.metadata.create_all(lm.engine)
-    except Exception:
-        pass
+    create_tables(lm.engine)
 
     try:
         admin_client.validate_token = gw_validate_db
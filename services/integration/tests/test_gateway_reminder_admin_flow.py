@@ -28,18 +28,15 @@ def reload_module(module_path, env_overrides=None):
 
 
 @pytest.mark.skipif(os.environ.get('RUN_INTEGRATION') != '1', reason="Integration test - set RUN_INTEGRATION=1 to run")
-def test_gateway_token_and_reminder_admin_flow():
+def test_gateway_token_and_reminder_admin_flow(memory_db_url, create_tables):
     # isolate DBs
-    gw_db = f"sqlite:////tmp/gateway_it_{os.getpid()}_{int(time.time()*1000)}.db"
-    rm_db = f"sqlite:////tmp/reminder_it_{os.getpid()}_{int(time.time()*1000)}.db"
+    gw_db = memory_db_url('gateway_it')
+    rm_db = memory_db_url('reminder_it')
 
     # load gateway
     gm = reload_module('microservice.gateway.main', {'GATEWAY_DB_URL': gw_db})
     # ensure tables exist for the gateway DB before sending requests
-    try:
-        SQLModel.metadata.create_all(gm.engine)
-    except Exception:
-        pass
+    create_tables(gm.engine)
     gw_client = TestClient(gm.app)
 
     # create token (bootstrap)
@@ -62,19 +59,8 @@ def test_gateway_token_and_reminder_admin_flow():
     # patch the admin_client.validate_token to call gw_client
     import microservice.gateway.admin_client as admin_client
     # ensure reminder tables exist
-    try:
-        SQLModel.metadata.create_all(rm.engine)
-        # also create per-model tables (covers cases where models originate from shared module)
-        try:
-            rm.Reminder.__table__.create(rm.engine, checkfirst=True)
-        except Exception:
-            pass
-        try:
-            rm.ReminderPreset.__table__.create(rm.engine, checkfirst=True)
-        except Exception:
-            pass
-    except Exception:
-        pass
+    # also create per-model tables (covers cases where models originate from shared module)
+    create_tables(rm.engine, rm.Reminder.__table__, rm.ReminderPreset.__table__)
 
     # prefer direct DB validation against gateway engine (avoids TestClient cross-calls)
     def gw_validate_db(token_arg: str) -> bool:
@@ -1,12 +1,21 @@
-from fastapi import FastAPI, HTTPException, Header, Depends, Response
+from fastapi import FastAPI, HTTPException, Header, Depends
+from fastapi.responses import FileResponse
 from sqlmodel import SQLModel, create_engine, Session, Field, select
+from sqlalchemy import delete, event, text as sql_text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import StaticPool
 from typing import Optional, List
 import os
 import glob
 import mimetypes
-import pdfplumber
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import pypdfium2 as pdfium
 import re
-from bs4 import BeautifulSoup
+import lxml.html
+
+# Blank-line paragraph separator used to chunk extracted text
+_PARA_RE = re.compile(r'\n\s*\n')
 
 # Entry model
 class Entry(SQLModel, table=True):
@@ -15,31 +24,100 @@ class Entry(SQLModel, table=True):
     page: int  # Page number
     chunk: int = 0  # Chunk number within page
     text: str  # Extracted text content
+    source: str = Field(default="", index=True)  # library file path relative to BOOKS_DIR
     title: str = ""
     content: str = ""
     category: str = "general"
     tags: str = ""
     created_at: str = ""
 
+# Last-parsed stat of each library file, so re-parsing skips unchanged files
+class FileState(SQLModel, table=True):
+    path: str = Field(primary_key=True)
+    mtime: float
+    size: int
+
+_ADMIN_KEY = os.getenv("ADMIN_KEY")
+
 def is_admin(x_admin_key: str = Header(None)):
-    admin_key = os.getenv("ADMIN_KEY")
     # if no local ADMIN_KEY configured, allow if no header provided; otherwise consult gateway
-    if not admin_key:
+    if not _ADMIN_KEY:
         token = x_admin_key
         if not token:
             return True
         # gateway validation disabled - no gateway client available
         raise HTTPException(status_code=403, detail="Admin access required")
     # local ADMIN_KEY set -> strict equality
-    if x_admin_key != admin_key:
+    if x_admin_key != _ADMIN_KEY:
         raise HTTPException(status_code=403, detail="Admin access required")
     return True
 
 
-db_url = "sqlite:////data/library_of_truth.db"
-engine = create_engine(db_url, echo=False)
+db_url = os.getenv("LIBRARY_OF_TRUTH_DB_URL", "sqlite:////data/library_of_truth.db")
+if ':memory:' in db_url or 'mode=memory' in db_url:
+    # in-memory DBs (tests): one shared connection across sessions and threads
+    engine = create_engine(db_url, echo=False, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+else:
+    engine = create_engine(db_url, echo=False, connect_args={"check_same_thread": False})
+
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL + relaxed fsync makes the bulk chunk inserts during parsing much cheaper
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+# --- Full-text index ---
+# External-content FTS5 table over entry.text, kept in sync by triggers so both
+# bulk parsing and add_entry are searchable without a LIKE '%q%' table scan.
+_FTS_DDL = [
+    "CREATE VIRTUAL TABLE entry_fts USING fts5(text, content='entry', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS entry_fts_ai AFTER INSERT ON entry BEGIN "
+    "INSERT INTO entry_fts(rowid, text) VALUES (new.id, new.text); END",
+    "CREATE TRIGGER IF NOT EXISTS entry_fts_ad AFTER DELETE ON entry BEGIN "
+    "INSERT INTO entry_fts(entry_fts, rowid, text) VALUES ('delete', old.id, old.text); END",
+    "CREATE TRIGGER IF NOT EXISTS entry_fts_au AFTER UPDATE ON entry BEGIN "
+    "INSERT INTO entry_fts(entry_fts, rowid, text) VALUES ('delete', old.id, old.text); "
+    "INSERT INTO entry_fts(rowid, text) VALUES (new.id, new.text); END",
+]
+
+
+def ensure_fts_index():
+    """Create the FTS5 index and sync triggers; backfill existing rows on first creation"""
+    with engine.begin() as conn:
+        exists = conn.execute(sql_text(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='entry_fts'"
+        )).first()
+        if exists:
+            return
+        for stmt in _FTS_DDL:
+            conn.execute(sql_text(stmt))
+        conn.execute(sql_text("INSERT INTO entry_fts(entry_fts) VALUES('rebuild')"))
+
+
+def ensure_entry_source():
+    """Add entry.source to databases created before it existed.
+
+    Rows parsed before then can't be told apart by path, so the stored file
+    states are dropped and the next parse re-reads every library file.
+    """
+    with engine.begin() as conn:
+        cols = {row[1] for row in conn.execute(sql_text("PRAGMA table_info(entry)"))}
+        if "source" in cols:
+            return
+        conn.execute(sql_text("ALTER TABLE entry ADD COLUMN source VARCHAR NOT NULL DEFAULT ''"))
+        conn.execute(sql_text("CREATE INDEX IF NOT EXISTS ix_entry_source ON entry (source)"))
+        conn.execute(sql_text("DELETE FROM filestate"))
 
 
+def _fts_query(q: str) -> str:
+    # One quoted prefix term per word: user punctuation can't trip the FTS5 query
+    # syntax, and partial or reordered words still match as they did with LIKE
+    return " ".join('"' + t.replace('"', '""') + '"*' for t in q.split())
+
 
 from contextlib import asynccontextmanager
 
@@ -52,6 +130,8 @@ async def lifespan(app: FastAPI):
 
         # Create database tables
         SQLModel.metadata.create_all(engine)
+        ensure_entry_source()
+        ensure_fts_index()
 
         # NOTE: Auto-parsing disabled to allow faster startup
         # Use POST /parse_books to manually trigger parsing of PDFs and HTML files
@@ -88,86 +168,243 @@ def get_book(filename: str):
     file_path = os.path.join(BOOKS_DIR, filename)
     if not os.path.isfile(file_path) or not file_path.endswith(".pdf"):
         raise HTTPException(status_code=404, detail="Book not found")
-    with open(file_path, "rb") as f:
-        data = f.read()
-    return Response(content=data, media_type=mimetypes.guess_type(file_path)[0] or "application/pdf")
+    # FileResponse streams from disk (sendfile where available) instead of buffering the whole PDF
+    # inline so browsers keep opening books in place rather than downloading them
+    return FileResponse(file_path, media_type=mimetypes.guess_type(file_path)[0] or "application/pdf",
+                        filename=filename, content_disposition_type="inline")
+
+# --- Bulk insert batching ---
+INSERT_BATCH_SIZE = 5000
+
+
+def _flush_rows(session: Session, rows: list):
+    """Bulk insert pending chunk rows and commit, skipping ORM object bookkeeping"""
+    if rows:
+        session.bulk_insert_mappings(Entry, rows)
+        session.commit()
+        rows.clear()
+
+
+def _queue_row(session: Session, rows: list, row: dict):
+    rows.append(row)
+    if len(rows) >= INSERT_BATCH_SIZE:
+        _flush_rows(session, rows)
+
+# --- Chunking ---
+CHUNK_SIZE = 500
+
+
+def _window(text: str, n: int = CHUNK_SIZE):
+    """Lazily yield fixed-size slices of text without building an intermediate list"""
+    return (text[i:i+n] for i in range(0, len(text), n))
+
+
+def _iter_chunks(text: str):
+    """Yield stripped, non-empty chunks of text: paragraphs, with oversized ones cut every 500 chars"""
+    if not text:
+        return
+    for c in _PARA_RE.split(text):
+        # strip once and filter on the result instead of stripping twice
+        if not (s := c.strip()):
+            continue
+        if len(s) <= CHUNK_SIZE:
+            yield s
+            continue
+        for piece in _window(s):
+            if (p := piece.strip()):
+                yield p
 
 # --- HTML Parsing ---
-def parse_html_file(html_file: str, session: Session):
-    """Parse a single HTML file and store chunks in database"""
+# Feed raw bytes to libxml2 so pages carrying an encoding declaration still parse
+_HTML_PARSER = lxml.html.HTMLParser(encoding='utf-8')
+
+def parse_html_file(html_file: str, session: Session, rows: list, source: str = ""):
+    """Parse a single HTML file and queue its chunks for bulk insert"""
     book = os.path.basename(html_file)
 
     try:
-        with open(html_file, 'r', encoding='utf-8') as f:
+        with open(html_file, 'rb') as f:
             html_content = f.read()
 
-        soup = BeautifulSoup(html_content, 'html.parser')
-
-        # Extract text from body, removing script and style tags
-        for script in soup(["script", "style"]):
-            script.decompose()
-
-        # Get text from body
-        body = soup.find('body')
-        if not body:
-            return
+        doc = lxml.html.fromstring(html_content, parser=_HTML_PARSER)
 
-        text = body.get_text(separator='\n', strip=True)
+        # Get body, removing script/style tags and comments
+        bodies = doc.xpath('//body')
+        if not bodies:
+            return True
+        body = bodies[0]
+        for node in body.xpath('.//script | .//style | .//comment()'):
+            node.drop_tree()
 
-        # Split into chunks (paragraphs or every 500 chars)
-        chunks = re.split(r'\n\s*\n', text) if text else []
-        if not chunks:
-            chunks = [text[i:i+500] for i in range(0, len(text), 500)] if text else []
+        text = '\n'.join(s for s in (t.strip() for t in body.itertext()) if s)
 
         # Store chunks (use page=1 for HTML files since they don't have pages)
-        for chunk_num, chunk in enumerate(chunks):
-            chunk = chunk.strip()
-            if chunk:
-                entry = Entry(book=book, page=1, chunk=chunk_num, text=chunk)
-                session.add(entry)
+        for chunk_num, chunk in enumerate(_iter_chunks(text)):
+            _queue_row(session, rows, {"book": book, "page": 1, "chunk": chunk_num, "text": chunk, "source": source})
+        return True
     except Exception as e:
         print(f"[Library] Error parsing HTML {book}: {e}")
+        return False
 
 # --- PDF Parsing and Chunking ---
+def _extract_page_text(pdf, index: int) -> str:
+    """Extract plain text of one page via PDFium, normalising CRLF line endings"""
+    page = pdf[index]
+    textpage = page.get_textpage()
+    try:
+        return (textpage.get_text_range() or "").replace("\r\n", "\n")
+    finally:
+        textpage.close()
+        page.close()
+
+# PDFs longer than this are split into page ranges so one huge book doesn't serialize on a single worker
+PDF_SHARD_THRESHOLD = 200
+PDF_PAGES_PER_SHARD = 100
+
+
+def _count_pdf_pages(pdf_file: str) -> int:
+    pdf = pdfium.PdfDocument(pdf_file)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def _pdf_page_ranges(total_pages: int):
+    """Split [0, total_pages) into half-open page ranges for the worker pool"""
+    if total_pages <= PDF_SHARD_THRESHOLD:
+        return [(0, total_pages)]
+    return [(lo, min(lo + PDF_PAGES_PER_SHARD, total_pages)) for lo in range(0, total_pages, PDF_PAGES_PER_SHARD)]
+
+
+def _parse_pdf_range(pdf_file: str, book: str, source: str, lo: int, hi: int) -> list:
+    """Extract chunk rows for pages [lo, hi) of one PDF; runs in a worker process"""
+    rows = []
+    pdf = pdfium.PdfDocument(pdf_file)
+    try:
+        for index in range(lo, hi):
+            text = _extract_page_text(pdf, index)
+            for chunk_num, chunk in enumerate(_iter_chunks(text)):
+                rows.append({"book": book, "page": index + 1, "chunk": chunk_num, "text": chunk, "source": source})
+    finally:
+        pdf.close()
+    return rows
+
+# --- Incremental file tracking ---
+def _scan_books(suffix: str, recursive: bool = False):
+    """Yield os.DirEntry objects under BOOKS_DIR with the given suffix"""
+    stack = [BOOKS_DIR]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except FileNotFoundError:
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        stack.append(entry.path)
+                elif entry.name.endswith(suffix):
+                    yield entry
+
+
+def _changed_files(session: Session, entries):
+    """Return (entry, stat) pairs whose mtime/size differ from the stored FileState"""
+    known = {fs.path: fs for fs in session.exec(select(FileState)).all()}
+    changed = []
+    for entry in entries:
+        st = entry.stat()
+        prev = known.get(entry.path)
+        if prev and prev.mtime == st.st_mtime and prev.size == st.st_size:
+            continue
+        changed.append((entry, st))
+    return changed
+
+
+def _source(path: str) -> str:
+    return os.path.relpath(path, BOOKS_DIR)
+
+
+def _begin_file(session: Session, entry):
+    # drop chunks from a previous parse of this file so re-parsing doesn't duplicate rows;
+    # keyed by path since recursively scanned HTML files can share a basename.
+    # Rows from before entry.source existed only carry the basename.
+    session.execute(delete(Entry).where(
+        (Entry.source == _source(entry.path))
+        | ((Entry.source == "") & (Entry.book == entry.name))
+    ))
+
+
+def _prune_missing(session: Session, seen_paths: set):
+    """Drop chunks and file states of library files that no longer exist"""
+    gone = [fs.path for fs in session.exec(select(FileState)).all() if fs.path not in seen_paths]
+    if not gone:
+        return
+    print(f"[Library] Removing {len(gone)} deleted files from the index")
+    for path in gone:
+        session.execute(delete(Entry).where(Entry.source == _source(path)))
+        session.execute(delete(FileState).where(FileState.path == path))
+
+
+def _record_file(session: Session, entry, st):
+    # committed together with the next batch flush
+    session.merge(FileState(path=entry.path, mtime=st.st_mtime, size=st.st_size))
+
+
 def parse_and_store_pdfs():
     with Session(engine) as session:
+        rows = []
         # Parse PDF files
-        pdf_files = glob.glob(os.path.join(BOOKS_DIR, "*.pdf"))
-        print(f"[Library] Found {len(pdf_files)} PDF files to parse")
-
-        for idx, pdf_file in enumerate(pdf_files, 1):
-            book = os.path.basename(pdf_file)
-            print(f"[Library] Parsing PDF {idx}/{len(pdf_files)}: {book}")
-            try:
-                with pdfplumber.open(pdf_file) as pdf:
-                    total_pages = len(pdf.pages)
-                    print(f"[Library]   Pages in {book}: {total_pages}")
-                    for page_num, page in enumerate(pdf.pages, 1):
-                        if page_num % 50 == 0:
-                            print(f"[Library]   Processing page {page_num}/{total_pages} of {book}")
-                        text = page.extract_text() or ""
-                        # Split into chunks (paragraphs or every 500 chars)
-                        chunks = re.split(r'\n\s*\n', text) if text else []
-                        if not chunks:
-                            chunks = [text[i:i+500] for i in range(0, len(text), 500)] if text else []
-                        for chunk_num, chunk in enumerate(chunks):
-                            chunk = chunk.strip()
-                            if chunk:
-                                entry = Entry(book=book, page=page_num, chunk=chunk_num, text=chunk)
-                                session.add(entry)
-                print(f"[Library]   Completed parsing {book}")
-            except Exception as e:
-                print(f"[Library]   ERROR parsing {book}: {e}")
-                continue
+        pdf_files = sorted(_scan_books(".pdf"), key=lambda e: e.path)
+        changed = _changed_files(session, pdf_files)
+        print(f"[Library] Found {len(pdf_files)} PDF files, {len(changed)} new or changed to parse")
+
+        # spawn, not fork: forking the running uvicorn process would copy its
+        # threads' locks into the workers
+        with ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn")) as ex:
+            # submit every page range up front so workers stay busy regardless of file-size skew
+            jobs = []
+            for entry, st in changed:
+                try:
+                    total_pages = _count_pdf_pages(entry.path)
+                    futures = [
+                        ex.submit(_parse_pdf_range, entry.path, entry.name, _source(entry.path), lo, hi)
+                        for lo, hi in _pdf_page_ranges(total_pages)
+                    ]
+                except Exception as e:
+                    print(f"[Library]   ERROR opening {entry.name}: {e}")
+                    continue
+                jobs.append((entry, st, total_pages, futures))
+
+            # consume results in submission order so each book's rows stay contiguous
+            for idx, (entry, st, total_pages, futures) in enumerate(jobs, 1):
+                book = entry.name
+                print(f"[Library] Parsing PDF {idx}/{len(jobs)}: {book} ({total_pages} pages)")
+                try:
+                    _begin_file(session, entry)
+                    for future in futures:
+                        for row in future.result():
+                            _queue_row(session, rows, row)
+                    _record_file(session, entry, st)
+                    print(f"[Library]   Completed parsing {book}")
+                except Exception as e:
+                    print(f"[Library]   ERROR parsing {book}: {e}")
+                    continue
 
         # Parse HTML files (recursively search subdirectories)
-        html_files = glob.glob(os.path.join(BOOKS_DIR, "**/*.html"), recursive=True)
-        print(f"[Library] Found {len(html_files)} HTML files to parse")
+        html_files = sorted(_scan_books(".html", recursive=True), key=lambda e: e.path)
+        changed = _changed_files(session, html_files)
+        print(f"[Library] Found {len(html_files)} HTML files, {len(changed)} new or changed to parse")
+
+        for idx, (entry, st) in enumerate(changed, 1):
+            print(f"[Library] Parsing HTML {idx}/{len(changed)}: {entry.name}")
+            _begin_file(session, entry)
+            if parse_html_file(entry.path, session, rows, _source(entry.path)):
+                _record_file(session, entry, st)
 
-        for idx, html_file in enumerate(html_files, 1):
-            print(f"[Library] Parsing HTML {idx}/{len(html_files)}: {os.path.basename(html_file)}")
-            parse_html_file(html_file, session)
+        _prune_missing(session, {e.path for e in pdf_files} | {e.path for e in html_files})
 
+        _flush_rows(session, rows)
         session.commit()
         print("[Library] ✓ All files parsed successfully")
 
@@ -180,9 +417,27 @@ def parse_books():
 # --- Search Endpoint ---
 @app.get("/search")
 def search_books(q: str, limit: int = 5) -> List[dict]:
-    # Simple keyword search
+    # Full-text search via the FTS5 index
+    match = _fts_query(q)
+    if match:
+        try:
+            with engine.connect() as conn:
+                results = conn.execute(sql_text(
+                    "SELECT e.book, e.page, e.text FROM entry_fts f JOIN entry e ON e.id = f.rowid "
+                    "WHERE entry_fts MATCH :q LIMIT :limit"
+                ), {"q": match, "limit": limit}).all()
+            return [
+                {"book": r.book, "page": r.page, "text": r.text}
+                for r in results
+            ]
+        except OperationalError as e:
+            # FTS5 unavailable (or index not yet created) - fall back to simple keyword search
+            print(f"[Library] FTS search unavailable, falling back to LIKE: {e}")
     with Session(engine) as session:
-        stmt = select(Entry).where(Entry.text.ilike(f"%{q}%")).limit(limit)
+        # a blank q lists the first `limit` entries, as LIKE '%%' used to
+        stmt = select(Entry).limit(limit)
+        if match:
+            stmt = stmt.where(Entry.text.ilike(f"%{q}%"))
         results = session.exec(stmt).all()
         return [
             {"book": e.book, "page": e.page, "text": e.text}
@@ -0,0 +1 @@
+# package marker for library_of_truth tests
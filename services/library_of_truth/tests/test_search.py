@@ -0,0 +1,41 @@
+import importlib
+import sys
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlmodel import SQLModel
+
+
+def reload_library_module(monkeypatch):
+    # fresh in-memory DB per test; the engine is built at import time
+    monkeypatch.setenv(
+        'LIBRARY_OF_TRUTH_DB_URL',
+        f"sqlite:///file:library_search_{uuid.uuid4().hex[:8]}?mode=memory&cache=shared&uri=true",
+    )
+    monkeypatch.delenv('ADMIN_KEY', raising=False)
+    try:
+        SQLModel.metadata.clear()
+    except Exception:
+        pass
+    if 'library_of_truth.main' in sys.modules:
+        del sys.modules['library_of_truth.main']
+    return importlib.import_module('library_of_truth.main')
+
+
+def test_search_matches_partial_and_reordered_words(monkeypatch):
+    lm = reload_library_module(monkeypatch)
+    with TestClient(lm.app) as client:
+        for text in ('Managing diabetes with daily exercise', 'Wound care basics'):
+            r = client.post('/', json={'book': 'health.pdf', 'page': 1, 'text': text})
+            assert r.status_code == 200
+
+        # prefix of a word, as the old LIKE '%q%' search found it
+        hits = client.get('/search', params={'q': 'diab'}).json()
+        assert [h['text'] for h in hits] == ['Managing diabetes with daily exercise']
+
+        # word order doesn't matter
+        hits = client.get('/search', params={'q': 'exercise daily'}).json()
+        assert len(hits) == 1
+
+        # blank query lists entries rather than matching nothing
+        assert len(client.get('/search', params={'q': '  '}).json()) == 2
@@ -1,10 +1,11 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks
-from fastapi.responses import Response
-from PIL import Image, ImageEnhance, ImageFilter
-from io import BytesIO
+from fastapi.responses import Response, ORJSONResponse
+import asyncio
 import pytesseract
 import re
-from sqlmodel import SQLModel, create_engine, Session, Field
+import time
+from sqlmodel import SQLModel, create_engine, Session, Field, select
+from sqlalchemy import bindparam, event, func, text
 from typing import Optional, List
 import os
 import httpx
@@ -12,6 +13,8 @@ import numpy as np
 import cv2
 import uuid
 import json
+import mmap
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from prometheus_client import Counter, Gauge, generate_latest, CONTENT_TYPE_LATEST
 
@@ -40,34 +43,60 @@ class OcrJob(SQLModel, table=True):
     status: str = Field(default="pending")  # pending, processing, completed, failed
     created_at: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
     completed_at: Optional[str] = None
-    image_path: str = ""  # Path to saved image
+    image_path: str = ""  # Path to saved image (comma-separated per page for multi-image uploads)
     ocr_text: Optional[str] = None  # Raw OCR output
     error_message: Optional[str] = None
     medication_id: Optional[int] = None  # ID of created medication if successful
     result_data: Optional[str] = None  # JSON string of result data
 
 db_url = "sqlite:////data/meds.db"
-engine = create_engine(db_url, echo=False)
+# Threadpool endpoints and the OCR worker share pooled connections across threads
+engine = create_engine(db_url, echo=False, connect_args={"check_same_thread": False})
+
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL + relaxed fsync: each commit appends one frame instead of several fsyncs
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+    cursor.execute("PRAGMA cache_size=-64000")  # ~64 MB page cache
+    cursor.close()
 
 # Image storage directory
 IMAGE_STORAGE_DIR = Path("/data/prescription_images")
 IMAGE_STORAGE_DIR.mkdir(parents=True, exist_ok=True)
 
 
+# Columns added to `med` after its first release, with their DDL types
+_MED_EXTRA_COLUMNS = {
+    'frequency_per_day': "INTEGER DEFAULT 1",
+    'times': "VARCHAR",
+    'from_ocr': "BOOLEAN DEFAULT 0",
+    'created_at': "VARCHAR",
+}
+_columns_ensured = False
+# Written once the migration has succeeded; bump the suffix when _MED_EXTRA_COLUMNS changes
+_SCHEMA_MARKER = Path("/data/.meds_schema_v2")
+
+
 def _ensure_columns():
     """Best-effort SQLite schema migrator for newly added med fields."""
+    global _columns_ensured
+    if _columns_ensured or _SCHEMA_MARKER.exists():
+        _columns_ensured = True
+        return
     try:
-        with engine.connect() as conn:
-            cols = conn.execute("PRAGMA table_info(med)").fetchall()
-            names = {c[1] for c in cols}
-            if 'frequency_per_day' not in names:
-                conn.execute("ALTER TABLE med ADD COLUMN frequency_per_day INTEGER DEFAULT 1")
-            if 'times' not in names:
-                conn.execute("ALTER TABLE med ADD COLUMN times VARCHAR")
-            if 'from_ocr' not in names:
-                conn.execute("ALTER TABLE med ADD COLUMN from_ocr BOOLEAN DEFAULT 0")
-            if 'created_at' not in names:
-                conn.execute("ALTER TABLE med ADD COLUMN created_at VARCHAR")
+        # one transaction, so any ALTERs share a single commit
+        with engine.begin() as conn:
+            names = {r[1] for r in conn.execute(text("PRAGMA table_info(med)"))}
+            for name, ddl in _MED_EXTRA_COLUMNS.items():
+                if name not in names:
+                    conn.execute(text(f"ALTER TABLE med ADD COLUMN {name} {ddl}"))
+        _columns_ensured = True
+        _SCHEMA_MARKER.touch()
     except Exception as e:
         print("[MEDS] Schema check failed (non-fatal):", e)
 
@@ -84,9 +113,11 @@ async def lifespan(app: FastAPI):
     except Exception:
         pass
     yield
+    if _http_client is not None:
+        await _http_client.aclose()
 
 
-app = FastAPI(title="Meds OCR Service", lifespan=lifespan)
+app = FastAPI(title="Meds OCR Service", lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # Health check endpoints
 @app.get("/status")
@@ -124,11 +155,23 @@ cb_open_gauge.labels(SERVICE_NAME).set(0)
 cb_open_until_gauge.labels(SERVICE_NAME).set(0)
 
 
+# Shared keep-alive client for downstream calls; created lazily, closed on shutdown
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=5.0, limits=httpx.Limits(max_keepalive_connections=20, max_connections=50)
+        )
+    return _http_client
+
+
 async def _post_json_with_retry(url: str, payload: dict, tag: str, retries: int = None, timeout: float = 5.0):
     global _cb_state
     retries = RETRY_COUNT if retries is None else retries
-    now = asyncio.get_event_loop().time()
-    if _cb_state["open_until"] > now:
+    if _cb_state["open_until"] > time.monotonic():
         print(f"[{tag}] circuit open; skipping call to {url}")
         cb_skips.labels(SERVICE_NAME, tag).inc()
         cb_open_gauge.labels(SERVICE_NAME).set(1)
@@ -136,26 +179,27 @@ async def _post_json_with_retry(url: str, payload: dict, tag: str, retries: int
         return False
 
     last_error = None
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        for attempt in range(retries + 1):
-            try:
-                resp = await client.post(url, json=payload)
-                if resp.status_code < 400:
-                    _cb_state["fail_count"] = 0
-                    cb_success.labels(SERVICE_NAME, tag).inc()
-                    cb_open_gauge.labels(SERVICE_NAME).set(0)
-                    cb_open_until_gauge.labels(SERVICE_NAME).set(0)
-                    return True
-                last_error = f"status {resp.status_code}: {resp.text}"
-            except Exception as e:
-                last_error = str(e)
-            await asyncio.sleep(RETRY_DELAY * (attempt + 1))
-
-    # record failure and possibly open circuit
+    client = _get_http_client()
+    for attempt in range(retries + 1):
+        try:
+            resp = await client.post(url, json=payload, timeout=timeout)
+            if resp.status_code < 400:
+                _cb_state["fail_count"] = 0
+                cb_success.labels(SERVICE_NAME, tag).inc()
+                cb_open_gauge.labels(SERVICE_NAME).set(0)
+                cb_open_until_gauge.labels(SERVICE_NAME).set(0)
+                return True
+            last_error = f"status {resp.status_code}: {resp.text}"
+        except Exception as e:
+            last_error = str(e)
+        await asyncio.sleep(RETRY_DELAY * (attempt + 1))
+
+    # record failure and possibly open circuit; there is no await between reading
+    # and writing _cb_state, so concurrent fan-out posts cannot interleave here
     _cb_state["fail_count"] += 1
     cb_failures.labels(SERVICE_NAME, tag).inc()
     if _cb_state["fail_count"] >= CB_FAIL_THRESHOLD:
-        _cb_state["open_until"] = now + CB_COOLDOWN
+        _cb_state["open_until"] = time.monotonic() + CB_COOLDOWN
         cb_open_gauge.labels(SERVICE_NAME).set(1)
         cb_open_until_gauge.labels(SERVICE_NAME).set(_cb_state["open_until"])
         print(f"[{tag}] circuit opened for {CB_COOLDOWN}s after failures")
@@ -167,62 +211,112 @@ async def _post_json_with_retry(url: str, payload: dict, tag: str, retries: int
 # startup handled by lifespan
 
 @app.get("/")
-def list_meds():
+def list_meds(response: Response, offset: int = 0, limit: int = 100):
+    """One page of meds in id order; X-Total-Count carries the full count so
+    clients can tell when there are more pages."""
     with Session(engine) as session:
-        meds = session.query(Med).all()
-        return meds
+        response.headers["X-Total-Count"] = str(session.exec(select(func.count()).select_from(Med)).one())
+        return session.exec(select(Med).order_by(Med.id).offset(offset).limit(limit)).all()
 
-def preprocess_image_for_ocr(image: Image.Image) -> Image.Image:
-    """
-    Preprocess image to improve OCR accuracy:
-    - Convert to grayscale
-    - Enhance contrast
-    - Apply denoising
-    - Apply adaptive thresholding
-    - Upscale for better character recognition
-    """
-    # Convert PIL image to numpy array
-    img_array = np.array(image)
 
-    # Convert to grayscale
-    if len(img_array.shape) == 3:
-        gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-    else:
-        gray = img_array
+def _upload_buffer(fobj) -> np.ndarray:
+    """uint8 view of an uploaded file's contents without copying it into a bytes object.
 
-    # Upscale image 2x for better OCR (helps with small text)
-    gray = cv2.resize(gray, None, fx=2, fy=2, interpolation=cv2.INTER_CUBIC)
+    UploadFile.file is a SpooledTemporaryFile; rolling it over to its temp file
+    lets the contents be memory-mapped read-only instead of read into memory.
+    """
+    fobj.rollover()
+    fobj.flush()
+    try:
+        mm = mmap.mmap(fobj.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:
+        # mmap refuses zero-length files; _decode_gray reports the empty upload
+        return np.empty(0, np.uint8)
+    return np.frombuffer(mm, np.uint8)
+
+
+def _decode_gray(buf: np.ndarray) -> np.ndarray:
+    """Decode uploaded image bytes straight to a grayscale array (no PIL round-trip)."""
+    # imdecode raises cv2.error (rather than returning None) on an empty buffer
+    if buf.size == 0:
+        raise ValueError("Empty image")
+    try:
+        gray = cv2.imdecode(buf, cv2.IMREAD_GRAYSCALE)
+    except cv2.error as e:
+        raise ValueError(f"Could not decode image: {e}")
+    if gray is None:
+        raise ValueError("Could not decode image")
+    return gray
 
-    # Denoise
-    denoised = cv2.fastNlMeansDenoising(gray, None, 10, 7, 21)
 
-    # Apply adaptive thresholding to handle varying lighting
-    thresh = cv2.adaptiveThreshold(
-        denoised, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
-    )
+UPLOAD_MAX_EDGE = 2048  # px; stored pages are downscaled to fit, ~200 DPI for a printed label
 
-    # Morphological operations to clean up noise
-    kernel = np.ones((1, 1), np.uint8)
-    cleaned = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel)
 
-    # Convert back to PIL Image
-    return Image.fromarray(cleaned)
+def _try_decode_gray(fobj) -> Optional[np.ndarray]:
+    try:
+        gray = _decode_gray(_upload_buffer(fobj))
+    except ValueError:
+        return None
+    # cap stored/OCR'd page size - a 12 MP phone photo adds cost, not legibility
+    h, w = gray.shape[:2]
+    if max(h, w) > UPLOAD_MAX_EDGE:
+        scale = UPLOAD_MAX_EDGE / max(h, w)
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return gray
+
+
+def _store_pages(job_id: str, uploads: list) -> List[Path]:
+    """Decode uploaded pages and save them as JPEGs; blocking, so run off the event loop.
+
+    Each upload is decoded straight from its spooled file, so only one page's
+    encoded bytes is held per worker rather than every upload at once.
+    Undecodable pages are skipped; raises ValueError if none can be decoded.
+    """
+    if len(uploads) == 1:
+        pages = [_try_decode_gray(uploads[0])]
+    else:
+        # cv2 releases the GIL while decoding, so pages decode in parallel
+        with ThreadPoolExecutor(max_workers=min(8, len(uploads))) as ex:
+            pages = list(ex.map(_try_decode_gray, uploads))
+    pages = [g for g in pages if g is not None]
+    if not pages:
+        raise ValueError("No decodable images")
+
+    image_paths = [
+        IMAGE_STORAGE_DIR / (f"{job_id}.jpg" if i == 1 else f"{job_id}_p{i}.jpg")
+        for i in range(1, len(pages) + 1)
+    ]
+    for path, page in zip(image_paths, pages):
+        cv2.imwrite(str(path), page, [cv2.IMWRITE_JPEG_QUALITY, 95])
+    return image_paths
+
+
+# All frequency phrasings in one alternation so the schedule text is scanned once;
+# the outer named group of each branch identifies which phrasing matched
+_FREQUENCY_RE = re.compile(
+    r"(?P<per_day>(?P<per_day_n>\d+)\s*x\s*/?\s*day)"
+    r"|(?P<twice>twice daily|two times a day)"
+    r"|(?P<three>three times)"
+    r"|(?P<every>every\s+(?P<every_n>\d+)\s*hour)",
+    re.I,
+)
 
 
 def _parse_frequency(text: str) -> int:
     # Look for patterns like "2x/day", "twice daily", "every 8 hours"
     try:
-        text_lower = text.lower()
-        m = re.search(r"(\d+)\s*x\s*/?\s*day", text_lower)
-        if m:
-            return max(1, int(m.group(1)))
-        if "twice daily" in text_lower or "two times a day" in text_lower:
+        found = {}
+        for m in _FREQUENCY_RE.finditer(text):
+            found.setdefault(m.lastgroup, m)
+        # same precedence as checking each phrasing in turn
+        if "per_day" in found:
+            return max(1, int(found["per_day"].group("per_day_n")))
+        if "twice" in found:
             return 2
-        if "three times" in text_lower:
+        if "three" in found:
             return 3
-        every_hours = re.search(r"every\s+(\d+)\s*hour", text_lower)
-        if every_hours:
-            hours = int(every_hours.group(1))
+        if "every" in found:
+            hours = int(found["every"].group("every_n"))
             if hours > 0:
                 return max(1, round(24 / hours))
     except Exception:
@@ -230,169 +324,238 @@ def _parse_frequency(text: str) -> int:
     return 1
 
 
+# HH:MM with an optional am/pm suffix (schedule text from OCR)
+_TIMES_RE = re.compile(r"\b(\d{1,2}:\d{2})\s*(?:am|pm)?\b", re.I)
+# bare HH:MM, for pulling times back out of a stored schedule
+_SCHED_TIMES_RE = re.compile(r"\b(\d{1,2}:\d{2})\b")
+
+
 def _parse_times(text: str) -> List[str]:
-    times = re.findall(r"\b(\d{1,2}:\d{2})\s*(?:am|pm|AM|PM)?\b", text)
-    # Normalize to HH:MM 24h if am/pm present is missing; keep as-is for now
-    return [t.strip() for t in times]
+    # Every match contains ':', so colon-free schedules ("twice daily") skip the regex
+    if ':' not in text:
+        return []
+    # Normalize to HH:MM 24h if am/pm present is missing; keep as-is for now.
+    # The captured group is digits and ':' only, so there is nothing to strip.
+    return _TIMES_RE.findall(text)
+
+
+def _normalize_times(times: Optional[str]) -> Optional[str]:
+    """Canonical comma-separated HH:MM list (no blanks/whitespace), applied at write time."""
+    if not times:
+        return None
+    return ",".join(t.strip() for t in times.split(',') if t.strip()) or None
 
 
 def _med_times_list(med: Med) -> List[str]:
+    # new writes are normalized (see _normalize_times), but rows stored before that
+    # may still hold "08:00, 20:00", so strip on read too
     if med.times:
         return [t.strip() for t in med.times.split(',') if t.strip()]
     # fallback: try to pull HH:MM from schedule text
-    matches = re.findall(r"\b(\d{1,2}:\d{2})\b", med.schedule or "")
-    return matches or []
+    schedule = med.schedule or ""
+    return _SCHED_TIMES_RE.findall(schedule) if ':' in schedule else []
 
 
 async def _fan_out_med(med: Med):
-    """Notify reminder, habits, and AI Brain about a med change (best-effort)."""
-    payload_times = _med_times_list(med)
-    # Reminders: create/update series
-    await _post_json_with_retry(REMINDER_SERIES_URL, {
-        "med_id": med.id,
-        "name": med.name,
-        "frequency_per_day": med.frequency_per_day,
-        "times": payload_times,
-        "start_date": med.created_at,
-        "schedule": med.schedule,
-    }, tag="MEDS->REMINDER")
+    """Notify reminder, habits, and AI Brain about a med change (best-effort).
 
-    # Habits: upsert med adherence
-    await _post_json_with_retry(HABITS_ADHERENCE_URL, {
-        "med_id": med.id,
-        "name": med.name,
-        "target_per_day": med.frequency_per_day,
-        "times": payload_times,
-    }, tag="MEDS->HABITS")
-
-    # AI Brain event log
-    await _post_json_with_retry(AI_EVENT_URL, {
-        "type": "med.prescribed",
-        "source": "meds",
-        "destination": ["reminder", "habits"],
-        "payload": {
+    The three posts are independent, so they are sent concurrently.
+    """
+    payload_times = _med_times_list(med)
+    await asyncio.gather(
+        # Reminders: create/update series
+        _post_json_with_retry(REMINDER_SERIES_URL, {
             "med_id": med.id,
             "name": med.name,
             "frequency_per_day": med.frequency_per_day,
             "times": payload_times,
-            "from_ocr": med.from_ocr,
-        }
-    }, tag="MEDS->AI")
+            "start_date": med.created_at,
+            "schedule": med.schedule,
+        }, tag="MEDS->REMINDER"),
+        # Habits: upsert med adherence
+        _post_json_with_retry(HABITS_ADHERENCE_URL, {
+            "med_id": med.id,
+            "name": med.name,
+            "target_per_day": med.frequency_per_day,
+            "times": payload_times,
+        }, tag="MEDS->HABITS"),
+        # AI Brain event log
+        _post_json_with_retry(AI_EVENT_URL, {
+            "type": "med.prescribed",
+            "source": "meds",
+            "destination": ["reminder", "habits"],
+            "payload": {
+                "med_id": med.id,
+                "name": med.name,
+                "frequency_per_day": med.frequency_per_day,
+                "times": payload_times,
+                "from_ocr": med.from_ocr,
+            }
+        }, tag="MEDS->AI"),
+        return_exceptions=True,
+    )
+
+async def _notify_med_change(med: Med):
+    await asyncio.gather(_send_to_ai_brain(med), _fan_out_med(med), return_exceptions=True)
+
+
+# Built once; the job_id is bound per call
+_JOB_BY_UUID = select(OcrJob).where(OcrJob.job_id == bindparam("jid"))
+
 
-def process_ocr_job(job_id: str):
-    """Background worker to process OCR job via AI Brain's intelligent analysis"""
+def _get_job(session: Session, job_id: str, pk: Optional[int] = None) -> Optional[OcrJob]:
+    """Look up a job by UUID, via a primary-key get when the caller knows the pk."""
+    if pk is not None:
+        job = session.get(OcrJob, pk)
+        if job is not None and job.job_id == job_id:
+            return job
+    return session.exec(_JOB_BY_UUID, params={"jid": job_id}).first()
+
+
+def _job_image_paths(job: OcrJob) -> List[Path]:
+    return [Path(p) for p in job.image_path.split(",") if p]
+
+
+def _start_job(job_id: str, pk: Optional[int]) -> Optional[List[Path]]:
+    """Mark the job processing and return its page paths (None if the job is gone)."""
     with Session(engine) as session:
-        job = session.query(OcrJob).filter(OcrJob.job_id == job_id).first()
+        job = _get_job(session, job_id, pk)
         if not job:
+            return None
+        # committed now because status polling reads it from other sessions
+        job.status = "processing"
+        session.add(job)
+        session.commit()
+        return _job_image_paths(job)
+
+
+def _finish_job(job_id: str, pk: Optional[int], ocr_text: str, med: Med) -> Med:
+    """Save the med and mark the job completed in a single transaction."""
+    with Session(engine) as session:
+        job = _get_job(session, job_id, pk)
+        job.ocr_text = ocr_text
+
+        # flush assigns the med's id so the job and the med commit together
+        session.add(med)
+        session.flush()
+
+        print(f"[OCR] Created medication via AI Brain: {med.name} (ID: {med.id})")
+
+        job.status = "completed"
+        job.completed_at = datetime.utcnow().isoformat()
+        job.medication_id = med.id
+        job.result_data = json.dumps({
+            "id": med.id,
+            "name": med.name,
+            "schedule": med.schedule,
+            "dosage": med.dosage,
+            "quantity": med.quantity,
+            "prescriber": med.prescriber,
+            "instructions": med.instructions
+        })
+        session.add(job)
+        session.commit()
+        session.refresh(med)
+        session.expunge(med)
+        return med
+
+
+def _fail_job(job_id: str, pk: Optional[int], error: str):
+    # fresh session: anything _finish_job flushed was rolled back when its session closed
+    with Session(engine) as session:
+        job = _get_job(session, job_id, pk)
+        if job is None:
+            return
+        job.status = "failed"
+        job.completed_at = datetime.utcnow().isoformat()
+        job.error_message = error
+        session.add(job)
+        session.commit()
+
+
+async def process_ocr_job(job_id: str, pk: Optional[int] = None):
+    """Background worker to process OCR job via AI Brain's intelligent analysis.
+
+    Runs on the event loop: the (long) AI Brain call is awaited on the shared
+    AsyncClient instead of pinning a threadpool thread for its duration, while
+    the blocking SQLite work goes to worker threads via the _*_job helpers.
+    """
+    try:
+        image_paths = await asyncio.to_thread(_start_job, job_id, pk)
+        if image_paths is None:
             print(f"[OCR] Job {job_id} not found")
             return
 
-        try:
-            # Update status to processing
-            job.status = "processing"
-            session.add(job)
-            session.commit()
+        print(f"[OCR] Starting processing for job {job_id}")
 
-            print(f"[OCR] Starting processing for job {job_id}")
-
-            # Load image from disk
-            image_path = Path(job.image_path)
-            if not image_path.exists():
-                raise FileNotFoundError(f"Image not found: {image_path}")
-
-            print(f"[OCR] Sending to AI Brain for intelligent analysis...")
-
-            # Send to AI Brain's /analyze/prescription endpoint (with LLM parsing)
-            import httpx
-            with open(image_path, 'rb') as img_file:
-                files = {'image': ('prescription.jpg', img_file, 'image/jpeg')}
-
-                # Call AI Brain with timeout (synchronous for background worker)
-                with httpx.Client(timeout=300.0) as client:
-                    response = client.post(
-                        "http://kilo-ai-brain:9004/analyze/prescription",
-                        files=files
-                    )
-
-                    if response.status_code != 200:
-                        raise Exception(f"AI Brain returned {response.status_code}: {response.text}")
-
-                    result = response.json()
-                    print(f"[OCR] AI Brain analysis complete: {result.get('success', False)}")
-
-                    if not result.get('success'):
-                        raise Exception(result.get('error', 'Analysis failed'))
-
-                    # Extract medication data from AI Brain's LLM-parsed response
-                    ocr_text = result.get('ocr_text', '')
-                    med_data = result.get('parsed_data', {})
-
-                    job.ocr_text = ocr_text
-                    session.add(job)
-                    session.commit()
-
-            # Parse frequency/times from schedule if available
-            schedule_text = med_data.get('schedule', '')
-            freq = _parse_frequency(schedule_text) if schedule_text else 1
-            times = _parse_times(schedule_text) if schedule_text else None
-
-            # Create medication from AI-extracted data
-            med = Med(
-                name=med_data.get('medication_name') or med_data.get('name') or 'Unknown Medication',
-                dosage=med_data.get('dosage', ''),
-                schedule=schedule_text,
-                quantity=0,  # AI Brain doesn't extract quantity yet
-                prescriber=med_data.get('prescriber', ''),
-                instructions=med_data.get('instructions', ''),
-                frequency_per_day=freq,
-                times=",".join(times) if times else None,
-                from_ocr=True,
-            )
-
-            # Save medication to database
-            session.add(med)
-            session.commit()
-            session.refresh(med)
+        # Load page image(s) from disk
+        missing = [str(p) for p in image_paths if not p.exists()]
+        if not image_paths or missing:
+            raise FileNotFoundError(f"Image not found: {', '.join(missing) or 'no pages recorded'}")
 
-            print(f"[OCR] Created medication via AI Brain: {med.name} (ID: {med.id})")
+        print(f"[OCR] Sending {len(image_paths)} page(s) to AI Brain for intelligent analysis...")
 
-            # Update job with success
-            job.status = "completed"
-            job.completed_at = datetime.utcnow().isoformat()
-            job.medication_id = med.id
-            job.result_data = json.dumps({
-                "id": med.id,
-                "name": med.name,
-                "schedule": med.schedule,
-                "dosage": med.dosage,
-                "quantity": med.quantity,
-                "prescriber": med.prescriber,
-                "instructions": med.instructions
-            })
-            session.add(job)
-            session.commit()
+        # Send to AI Brain's /analyze/prescription endpoint (with LLM parsing);
+        # extra pages go as separate parts so each page is OCR'd on its own
+        page_bytes = await asyncio.gather(*(asyncio.to_thread(p.read_bytes) for p in image_paths))
+        files = [('image', ('prescription.jpg', page_bytes[0], 'image/jpeg'))]
+        files += [('pages', (f'page{i}.jpg', b, 'image/jpeg')) for i, b in enumerate(page_bytes[1:], 2)]
+        del page_bytes
+
+        response = await _get_http_client().post(
+            "http://kilo-ai-brain:9004/analyze/prescription",
+            files=files,
+            timeout=300.0,
+        )
 
-            print(f"[OCR] Job {job_id} completed successfully")
+        if response.status_code != 200:
+            raise Exception(f"AI Brain returned {response.status_code}: {response.text}")
+
+        result = response.json()
+        print(f"[OCR] AI Brain analysis complete: {result.get('success', False)}")
+
+        if not result.get('success'):
+            raise Exception(result.get('error', 'Analysis failed'))
+
+        # Extract medication data from AI Brain's LLM-parsed response
+        ocr_text = result.get('ocr_text', '')
+        med_data = result.get('parsed_data', {})
+
+        # Parse frequency/times from schedule if available
+        schedule_text = med_data.get('schedule', '')
+        freq = _parse_frequency(schedule_text) if schedule_text else 1
+        times = _parse_times(schedule_text) if schedule_text else None
+
+        # Create medication from AI-extracted data
+        med = Med(
+            name=med_data.get('medication_name') or med_data.get('name') or 'Unknown Medication',
+            dosage=med_data.get('dosage', ''),
+            schedule=schedule_text,
+            quantity=0,  # AI Brain doesn't extract quantity yet
+            prescriber=med_data.get('prescriber', ''),
+            instructions=med_data.get('instructions', ''),
+            frequency_per_day=freq,
+            times=",".join(times) if times else None,
+            from_ocr=True,
+        )
+        med = await asyncio.to_thread(_finish_job, job_id, pk, ocr_text, med)
 
-            # Send to AI brain asynchronously (fire and forget)
-            import asyncio
-            try:
-                asyncio.create_task(_send_to_ai_brain(med))
-                asyncio.create_task(_fan_out_med(med))
-            except:
-                pass
+        print(f"[OCR] Job {job_id} completed successfully")
 
+        # Notify AI brain/reminder/habits
+        try:
+            await _notify_med_change(med)
         except Exception as e:
-            print(f"[OCR] Job {job_id} failed: {e}")
-            import traceback
-            traceback.print_exc()
-            job.status = "failed"
-            job.completed_at = datetime.utcnow().isoformat()
-            job.error_message = str(e)
-            session.add(job)
-            session.commit()
+            print(f"[OCR] Notifying downstream services failed: {e}")
+
+    except Exception as e:
+        print(f"[OCR] Job {job_id} failed: {e}")
+        import traceback
+        traceback.print_exc()
+        await asyncio.to_thread(_fail_job, job_id, pk, str(e))
 
-@app.post("/extract")
+
+@app.post("/extract", response_model=None)
 async def extract_med_from_image(
     file: UploadFile = File(None),
     files: List[UploadFile] = File(None),
@@ -406,82 +569,69 @@ async def extract_med_from_image(
     job_id = str(uuid.uuid4())
 
     try:
-        # Handle multiple images (stitch) or single image
+        # Handle multiple images (one page each) or single image
         if files and len(files) > 0:
-            # Multiple images - stitch them horizontally
-            images = []
-            for f in files:
-                if not f.content_type.startswith("image/"):
-                    continue
-                img_bytes = f.file.read()
-                img = Image.open(BytesIO(img_bytes))
-                images.append(img)
-
-            if len(images) == 0:
+            # Multiple images - kept as separate pages so each is OCR'd on its own
+            uploads = [f.file for f in files if f.content_type.startswith("image/")]
+            if len(uploads) == 0:
                 raise HTTPException(status_code=400, detail="No valid images provided.")
-
-            # Stitch images horizontally
-            widths, heights = zip(*(i.size for i in images))
-            total_width = sum(widths)
-            max_height = max(heights)
-            final_image = Image.new('RGB', (total_width, max_height))
-            x_offset = 0
-            for img in images:
-                final_image.paste(img, (x_offset, 0))
-                x_offset += img.width
-
         elif file:
             # Single image
             if not file.content_type.startswith("image/"):
                 raise HTTPException(status_code=400, detail="File must be an image.")
-            img_bytes = file.file.read()
-            final_image = Image.open(BytesIO(img_bytes))
+            uploads = [file.file]
         else:
             raise HTTPException(status_code=400, detail="No image provided.")
 
-        # Save image to disk
-        image_path = IMAGE_STORAGE_DIR / f"{job_id}.jpg"
-        final_image.save(image_path, "JPEG", quality=95)
+        # Decode and save page image(s) off the event loop
+        try:
+            image_paths = await asyncio.to_thread(_store_pages, job_id, uploads)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="No valid images provided." if files else "Could not decode image.")
 
-        print(f"[OCR] Saved image for job {job_id} to {image_path}")
+        print(f"[OCR] Saved {len(image_paths)} image(s) for job {job_id} to {IMAGE_STORAGE_DIR}")
 
         # Create job record
         job = OcrJob(
             job_id=job_id,
             status="pending",
-            image_path=str(image_path)
+            image_path=",".join(str(p) for p in image_paths)
         )
 
         with Session(engine) as session:
             session.add(job)
             session.commit()
+            job_pk = job.id
 
         # Queue background processing
         if background_tasks:
-            background_tasks.add_task(process_ocr_job, job_id)
+            background_tasks.add_task(process_ocr_job, job_id, job_pk)
         else:
             # Fallback for testing
-            import asyncio
-            asyncio.create_task(asyncio.to_thread(process_ocr_job, job_id))
+            asyncio.create_task(process_ocr_job(job_id, job_pk))
 
         print(f"[OCR] Queued job {job_id} for processing")
 
-        return {
+        # plain dict of primitives - hand it to orjson directly, no jsonable_encoder pass
+        return ORJSONResponse({
             "job_id": job_id,
+            "pk": job_pk,
             "status": "pending",
             "message": "Image received. Processing in background...",
-            "poll_url": f"/extract/{job_id}/status"
-        }
+            "poll_url": f"/extract/{job_id}/status?pk={job_pk}"
+        })
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"[OCR] Error creating job: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to process image: {str(e)}")
 
 @app.get("/extract/{job_id}/status")
-def get_job_status(job_id: str):
+def get_job_status(job_id: str, pk: Optional[int] = None):
     """Get status of OCR job"""
     with Session(engine) as session:
-        job = session.query(OcrJob).filter(OcrJob.job_id == job_id).first()
+        job = _get_job(session, job_id, pk)
         if not job:
             raise HTTPException(status_code=404, detail="Job not found")
 
@@ -503,10 +653,10 @@ def get_job_status(job_id: str):
         return response
 
 @app.get("/extract/{job_id}/result")
-def get_job_result(job_id: str):
+def get_job_result(job_id: str, pk: Optional[int] = None):
     """Get result of completed OCR job"""
     with Session(engine) as session:
-        job = session.query(OcrJob).filter(OcrJob.job_id == job_id).first()
+        job = _get_job(session, job_id, pk)
         if not job:
             raise HTTPException(status_code=404, detail="Job not found")
 
@@ -536,7 +686,7 @@ def update_med(med_id: int, med: Med, background_tasks: BackgroundTasks = None):
         db_med.prescriber = med.prescriber
         db_med.instructions = med.instructions
         db_med.frequency_per_day = med.frequency_per_day or 1
-        db_med.times = med.times or db_med.times
+        db_med.times = _normalize_times(med.times) or db_med.times
         session.add(db_med)
         session.commit()
         session.refresh(db_med)
@@ -556,8 +706,9 @@ def add_med(med: Med, background_tasks: BackgroundTasks = None):
             med.created_at = datetime.utcnow().isoformat()
         if not med.frequency_per_day:
             med.frequency_per_day = 1
-        if not med.times:
-            med.times = ",".join(_parse_times(med.schedule)) if med.schedule else med.times
+        med.times = _normalize_times(med.times)
+        if not med.times and med.schedule:
+            med.times = _normalize_times(",".join(_parse_times(med.schedule)))
         session.add(med)
         session.commit()
         session.refresh(med)
@@ -0,0 +1,53 @@
+import asyncio
+
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, Session, create_engine, select
+
+import meds.main as meds_main
+from meds.main import Med, OcrJob
+
+
+class _FakeResponse:
+    status_code = 200
+    text = ''
+
+    def json(self):
+        return {
+            'success': True,
+            'ocr_text': 'AMOXICILLIN 500MG',
+            'parsed_data': {'medication_name': 'Amoxicillin', 'dosage': '500mg', 'schedule': ''},
+        }
+
+
+class _FakeClient:
+    async def post(self, *a, **k):
+        return _FakeResponse()
+
+
+def test_failed_ocr_job_leaves_no_orphan_med(monkeypatch, tmp_path):
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    monkeypatch.setattr(meds_main, 'engine', engine)
+    monkeypatch.setattr(meds_main, '_get_http_client', lambda: _FakeClient())
+
+    image = tmp_path / 'label.jpg'
+    image.write_bytes(b'not really a jpeg')
+    with Session(engine) as session:
+        job = OcrJob(job_id='job-1', image_path=str(image))
+        session.add(job)
+        session.commit()
+        pk = job.id
+
+    # blow up after the Med has been flushed but before the terminal commit
+    def boom(*a, **k):
+        raise RuntimeError('serialization failed')
+    monkeypatch.setattr(meds_main.json, 'dumps', boom)
+
+    asyncio.run(meds_main.process_ocr_job('job-1', pk))
+
+    with Session(engine) as session:
+        assert session.exec(select(Med)).all() == []
+        job = session.get(OcrJob, pk)
+        assert job.status == 'failed'
+        assert job.medication_id is None
+        assert 'serialization failed' in job.error_message
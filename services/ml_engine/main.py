@@ -14,8 +14,16 @@ from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import datetime
 import os
+import re
 import json
+import time
+import atexit
+import httpx
+import orjson
 import joblib
+import traceback
+from io import BytesIO
+from collections import OrderedDict
 from pathlib import Path
 import numpy as np
 
@@ -41,6 +49,11 @@ def _get_pandas():
 MODELS_DIR = Path("/data/ml_models")
 MODELS_DIR.mkdir(parents=True, exist_ok=True)
 
+# Shared keep-alive client for calls to the habits service
+HABITS_URL = os.getenv("HABITS_URL", "http://habits:9003")
+_HTTP = httpx.Client(base_url=HABITS_URL, timeout=10, limits=httpx.Limits(max_keepalive_connections=20))
+atexit.register(_HTTP.close)
+
 app = FastAPI(title="ML Engine Service")
 
 # Health check
@@ -119,31 +132,110 @@ def _extract_habit_features(req: HabitPredictionRequest, current_time: datetime.
         "week_completion_rate": week_completion_rate
     }
 
-def _rule_based_prediction(features: Dict[str, Any]) -> float:
+def _rule_based_prediction_vec(features: np.ndarray) -> np.ndarray:
     """
-    Simple rule-based prediction when no ML model is trained yet.
-    Returns probability between 0.0 and 1.0.
+    Rule-based completion probabilities for a (N, 6) feature matrix (columns in
+    _feature_row order), used when no ML model is trained yet.
+    Returns a length-N array of probabilities between 0.0 and 1.0.
     """
-    base_prob = 0.5
+    hour = features[:, 1]
+    streak = features[:, 2]
+    is_weekend = features[:, 4]
+    rate = features[:, 5]
 
+    p = np.full(len(features), 0.5)
     # Strong streak? High probability
-    if features["current_streak"] >= 7:
-        base_prob += 0.3
-    elif features["current_streak"] >= 3:
-        base_prob += 0.15
-
+    p += np.where(streak >= 7, 0.3, np.where(streak >= 3, 0.15, 0.0))
     # Good week completion rate? Higher probability
-    base_prob += features["week_completion_rate"] * 0.2
-
+    p += rate * 0.2
     # Weekend penalty (many people skip habits on weekends)
-    if features["is_weekend"]:
-        base_prob -= 0.1
-
+    p -= is_weekend * 0.1
     # Late night penalty (less likely to complete habits late)
-    if features["hour_of_day"] >= 22:
-        base_prob -= 0.15
+    p -= (hour >= 22) * 0.15
+    return np.clip(p, 0.0, 1.0, out=p)
+
+def _rule_based_prediction(features: Dict[str, Any]) -> float:
+    """Single-habit wrapper around _rule_based_prediction_vec."""
+    return float(_rule_based_prediction_vec(np.array([_feature_row(features)], dtype=float))[0])
+
+# Loaded models keyed by habit_id -> (file mtime, model); LRU-bounded so a large
+# number of habits can't pin every model in memory
+MODEL_CACHE_SIZE = 128
+_MODEL_CACHE: "OrderedDict[int, tuple]" = OrderedDict()
+
+def _get_model(habit_id: int, model_path: Path):
+    """Return the trained model for a habit, unpickling only when the file changed."""
+    mtime = model_path.stat().st_mtime
+    cached = _MODEL_CACHE.get(habit_id)
+    if cached is not None and cached[0] == mtime:
+        _MODEL_CACHE.move_to_end(habit_id)
+        return cached[1]
+    model = joblib.load(model_path)
+    _MODEL_CACHE[habit_id] = (mtime, model)
+    _MODEL_CACHE.move_to_end(habit_id)
+    if len(_MODEL_CACHE) > MODEL_CACHE_SIZE:
+        _MODEL_CACHE.popitem(last=False)
+    return model
+
+# Compress pickles on disk; lz4 when installed keeps cold loads cheap, zlib otherwise
+try:
+    import lz4  # noqa: F401
+    MODEL_COMPRESS = ("lz4", 3)
+except ImportError:
+    MODEL_COMPRESS = 3
+
+def _feature_row(features: Dict[str, Any]) -> list:
+    """Features in the column order the models are trained on."""
+    return [
+        features["day_of_week"],
+        features["hour_of_day"],
+        features["current_streak"],
+        features["completions_this_week"],
+        features["is_weekend"],
+        features["week_completion_rate"]
+    ]
+
+def _predict_probability(habit_id: int, features: Dict[str, Any]) -> tuple:
+    """(probability, confidence) from the habit's trained model, or the rules without one."""
+    # Try to load trained model
+    model_path = MODELS_DIR / f"habit_completion_{habit_id}.pkl"
 
-    return max(0.0, min(1.0, base_prob))
+    if model_path.exists():
+        try:
+            model = _get_model(habit_id, model_path)
+            feature_vector = np.array([_feature_row(features)])
+            probability = model.predict_proba(feature_vector)[0][1]  # Probability of class 1 (completion)
+            return float(probability), "high"
+        except Exception as e:
+            print(f"Model loading failed: {e}, falling back to rules")
+            return _rule_based_prediction(features), "medium"
+    # No trained model yet, use rules
+    return _rule_based_prediction(features), "low"
+
+# Predictions are deterministic in (habit, features), and the time-dependent
+# features are part of the key; cleared whenever models are retrained.
+PREDICTION_CACHE_TTL = 900
+PREDICTION_CACHE_MAX = 4096
+_prediction_cache: Dict[tuple, tuple] = {}
+
+def _cached_probability(habit_id: int, features: Dict[str, Any]) -> tuple:
+    key = (
+        habit_id,
+        features["day_of_week"],
+        features["hour_of_day"],
+        features["current_streak"],
+        features["completions_this_week"],
+        features["week_completion_rate"],
+    )
+    now = time.monotonic()
+    hit = _prediction_cache.get(key)
+    if hit and hit[0] > now:
+        return hit[1]
+    result = _predict_probability(habit_id, features)
+    if len(_prediction_cache) >= PREDICTION_CACHE_MAX:
+        _prediction_cache.clear()
+    _prediction_cache[key] = (now + PREDICTION_CACHE_TTL, result)
+    return result
 
 # --- Prediction Endpoints ---
 
@@ -159,32 +251,10 @@ def predict_habit_completion(req: HabitPredictionRequest):
     # Extract features
     features = _extract_habit_features(req, current_time)
 
-    # Try to load trained model
-    model_path = MODELS_DIR / f"habit_completion_{req.habit_id}.pkl"
-
-    if model_path.exists():
-        try:
-            model = joblib.load(model_path)
-            # Convert features to numpy array in correct order
-            feature_vector = np.array([[
-                features["day_of_week"],
-                features["hour_of_day"],
-                features["current_streak"],
-                features["completions_this_week"],
-                features["is_weekend"],
-                features["week_completion_rate"]
-            ]])
-            probability = model.predict_proba(feature_vector)[0][1]  # Probability of class 1 (completion)
-            confidence = "high"
-        except Exception as e:
-            print(f"Model loading failed: {e}, falling back to rules")
-            probability = _rule_based_prediction(features)
-            confidence = "medium"
-    else:
-        # No trained model yet, use rules
-        probability = _rule_based_prediction(features)
-        confidence = "low"
+    probability, confidence = _cached_probability(req.habit_id, features)
+    return _prediction_response(req, probability, confidence)
 
+def _prediction_response(req: HabitPredictionRequest, probability: float, confidence: str) -> HabitPredictionResponse:
     # Generate recommendation
     should_remind = probability < 0.6
 
@@ -205,6 +275,63 @@ def predict_habit_completion(req: HabitPredictionRequest):
         should_send_reminder=should_remind
     )
 
+class BatchHabitPredictionRequest(BaseModel):
+    items: List[HabitPredictionRequest]
+
+@app.post("/predict/habit_completion/batch", response_model=List[HabitPredictionResponse])
+def predict_habit_completion_batch(batch: BatchHabitPredictionRequest):
+    """
+    Predict completion probabilities for many habits in one call.
+
+    Rows are grouped by habit so each trained model runs predict_proba once
+    over a stacked feature matrix instead of once per habit.
+    """
+    current_time = datetime.datetime.now()
+    items = batch.items
+    features = [_extract_habit_features(r, current_time) for r in items]
+    results: List[Optional[tuple]] = [None] * len(items)
+
+    groups: Dict[int, List[int]] = {}
+    for i, r in enumerate(items):
+        groups.setdefault(r.habit_id, []).append(i)
+
+    for habit_id, idx in groups.items():
+        model_path = MODELS_DIR / f"habit_completion_{habit_id}.pkl"
+        if model_path.exists():
+            try:
+                model = _get_model(habit_id, model_path)
+                X = np.array([_feature_row(features[i]) for i in idx])
+                for i, p in zip(idx, model.predict_proba(X)[:, 1]):
+                    results[i] = (float(p), "high")
+                continue
+            except Exception as e:
+                print(f"Model loading failed: {e}, falling back to rules")
+                confidence = "medium"
+        else:
+            confidence = "low"
+        X = np.array([_feature_row(features[i]) for i in idx], dtype=float)
+        for i, p in zip(idx, _rule_based_prediction_vec(X)):
+            results[i] = (float(p), confidence)
+
+    return [_prediction_response(r, p, c) for r, (p, c) in zip(items, results)]
+
+# Habit-name keyword buckets for reminder timing, in priority order; matched as
+# plain substrings, the same as the old per-bucket `word in name` checks
+_TIMING_RE = re.compile(
+    r"(?P<morning>morning|breakfast|coffee|wake)"
+    r"|(?P<lunch>lunch|afternoon|midday)"
+    r"|(?P<evening>evening|dinner|night|bed)"
+    r"|(?P<exercise>exercise|workout|gym|run)"
+)
+_TIMING_BUCKETS = {
+    "morning": (["07:30", "08:00", "08:30"], "Based on typical morning routines, these times work well for '{name}'"),
+    "lunch": (["12:00", "12:30", "13:00"], "Midday reminders are effective for '{name}'"),
+    "evening": (["18:00", "19:00", "20:00"], "Evening times are optimal for '{name}'"),
+    "exercise": (["17:00", "17:30", "18:00"], "After-work times are common for '{name}'"),
+}
+# Generic defaults
+_TIMING_DEFAULT = (["09:00", "14:00", "19:00"], "General reminder times for '{name}'. Will personalize as I learn your patterns.")
+
 @app.post("/predict/reminder_timing", response_model=ReminderTimingResponse)
 def predict_optimal_reminder_timing(req: ReminderTimingRequest):
     """
@@ -215,28 +342,11 @@ def predict_optimal_reminder_timing(req: ReminderTimingRequest):
     # For now, use smart defaults based on habit name patterns
     # In future, this will analyze actual completion time history
 
-    habit_lower = req.habit_name.lower()
-
-    if any(word in habit_lower for word in ["morning", "breakfast", "coffee", "wake"]):
-        optimal_times = ["07:30", "08:00", "08:30"]
-        reasoning = f"Based on typical morning routines, these times work well for '{req.habit_name}'"
-
-    elif any(word in habit_lower for word in ["lunch", "afternoon", "midday"]):
-        optimal_times = ["12:00", "12:30", "13:00"]
-        reasoning = f"Midday reminders are effective for '{req.habit_name}'"
-
-    elif any(word in habit_lower for word in ["evening", "dinner", "night", "bed"]):
-        optimal_times = ["18:00", "19:00", "20:00"]
-        reasoning = f"Evening times are optimal for '{req.habit_name}'"
-
-    elif any(word in habit_lower for word in ["exercise", "workout", "gym", "run"]):
-        optimal_times = ["17:00", "17:30", "18:00"]
-        reasoning = f"After-work times are common for '{req.habit_name}'"
-
-    else:
-        # Generic defaults
-        optimal_times = ["09:00", "14:00", "19:00"]
-        reasoning = f"General reminder times for '{req.habit_name}'. Will personalize as I learn your patterns."
+    # Several buckets can match ("morning run"); the earliest-listed bucket wins
+    buckets = {m.lastgroup for m in _TIMING_RE.finditer(req.habit_name.lower())}
+    bucket = next((name for name in _TIMING_BUCKETS if name in buckets), None)
+    optimal_times, reasoning = _TIMING_BUCKETS.get(bucket, _TIMING_DEFAULT)
+    reasoning = reasoning.format(name=req.habit_name)
 
     return ReminderTimingResponse(
         habit_id=req.habit_id,
@@ -244,8 +354,42 @@ def predict_optimal_reminder_timing(req: ReminderTimingRequest):
         reasoning=reasoning
     )
 
+INSIGHTS_PATH = MODELS_DIR / "insights.json"
+INSIGHTS_MAX_AGE = 24 * 3600  # seconds; older cached insights are recomputed
+# (mtime, insights) of the last insights.json read, so repeat requests skip the FS read
+_insights_memo: Optional[tuple] = None
+
+def _compute_and_cache_insights() -> List[PatternInsight]:
+    """Run pattern detection and persist the result to insights.json."""
+    insights = _detect_patterns()
+    try:
+        with open(INSIGHTS_PATH, 'w') as f:
+            json.dump([insight.dict() for insight in insights], f, indent=2)
+    except Exception:
+        pass
+    return insights
+
+def _cached_insights() -> Optional[List[PatternInsight]]:
+    """Insights from insights.json if it is fresh enough, else None."""
+    global _insights_memo
+    try:
+        mtime = INSIGHTS_PATH.stat().st_mtime
+    except OSError:
+        return None
+    if time.time() - mtime > INSIGHTS_MAX_AGE:
+        return None
+    if _insights_memo is not None and _insights_memo[0] == mtime:
+        return _insights_memo[1]
+    try:
+        with open(INSIGHTS_PATH) as f:
+            insights = [PatternInsight(**item) for item in json.load(f)]
+    except Exception:
+        return None
+    _insights_memo = (mtime, insights)
+    return insights
+
 @app.get("/insights/patterns", response_model=List[PatternInsight])
-def get_pattern_insights():
+def get_pattern_insights(refresh: bool = False):
     """
     Return discovered patterns and insights about Kyle's behavior.
 
@@ -253,19 +397,16 @@ def get_pattern_insights():
     - "Kyle exercises more on Mon/Wed/Fri"
     - "Medication adherence drops on weekends"
     - "Water intake correlates with exercise"
-    """
-    # Run pattern detection analysis
-    insights = _detect_patterns()
 
-    # Save insights for caching
-    insights_path = MODELS_DIR / "insights.json"
-    try:
-        with open(insights_path, 'w') as f:
-            json.dump([insight.dict() for insight in insights], f, indent=2)
-    except Exception:
-        pass
-
-    return insights
+    Insights are computed by the nightly training run and served from
+    insights.json; they are only recomputed here when that file is missing,
+    more than a day old, or `refresh` is set.
+    """
+    if not refresh:
+        cached = _cached_insights()
+        if cached is not None:
+            return cached
+    return _compute_and_cache_insights()
 
 def _detect_patterns() -> List[PatternInsight]:
     """
@@ -274,24 +415,22 @@ def _detect_patterns() -> List[PatternInsight]:
     insights = []
 
     try:
-        import httpx
-        from collections import defaultdict
-        from datetime import datetime, timedelta
-
         # Fetch habit data
-        habits_url = os.getenv("HABITS_URL", "http://habits:9003")
-        response = httpx.get(f"{habits_url}/habits", timeout=10)
+        response = _HTTP.get("/habits")
 
         if response.status_code != 200:
             return [_default_insight()]
 
-        habits = response.json()
+        habits = orjson.loads(response.content)
 
         if not habits or len(habits) == 0:
             return [_default_insight()]
 
+        # Parse each habit's completion dates once for all analyzers
+        prepared = [(habit, *_prepare_completions(habit)) for habit in habits]
+
         # Pattern 1: Weekly completion patterns
-        weekly_patterns = _analyze_weekly_patterns(habits)
+        weekly_patterns = _analyze_weekly_patterns(prepared)
         insights.extend(weekly_patterns)
 
         # Pattern 2: Streak analysis
@@ -299,7 +438,7 @@ def _detect_patterns() -> List[PatternInsight]:
         insights.extend(streak_insights)
 
         # Pattern 3: Completion time patterns
-        time_insights = _analyze_completion_times(habits)
+        time_insights = _analyze_completion_times(prepared)
         insights.extend(time_insights)
 
         # If no patterns found, return default
@@ -321,40 +460,44 @@ def _default_insight() -> PatternInsight:
         actionable=False
     )
 
-def _analyze_weekly_patterns(habits: list) -> List[PatternInsight]:
+def _prepare_completions(habit: dict) -> tuple:
+    """
+    (dates, counts) for a habit's completions with a parseable completion_date:
+    dates as datetime64[D] (the timestamp's own calendar day), counts as int64.
+    """
+    dates = []
+    counts = []
+    for completion in habit.get("completions", []):
+        try:
+            date_str = completion.get("completion_date") or ""
+            dates.append(datetime.datetime.fromisoformat(date_str.replace('Z', '+00:00')).date())
+        except (TypeError, ValueError, AttributeError):
+            continue
+        counts.append(completion.get("count") or 0)
+    return np.array(dates, dtype="datetime64[D]"), np.array(counts, dtype=np.int64)
+
+_DAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+def _analyze_weekly_patterns(prepared: list) -> List[PatternInsight]:
     """Detect day-of-week patterns in habit completions."""
     insights = []
-    from collections import defaultdict
-    from datetime import datetime
 
-    for habit in habits:
-        completions = habit.get("completions", [])
-        if len(completions) < 7:
+    for habit, dates, counts in prepared:
+        if len(habit.get("completions", [])) < 7:
             continue
 
-        # Count completions by day of week
-        day_counts = defaultdict(int)
-        for completion in completions:
-            date_str = completion.get("completion_date")
-            if date_str:
-                try:
-                    date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                    day_name = date.strftime("%A")
-                    if completion.get("count", 0) > 0:
-                        day_counts[day_name] += 1
-                except:
-                    pass
-
-        if not day_counts:
-            continue
+        # Count completions by day of week (Monday=0; 1970-01-01 was a Thursday)
+        done = dates[counts > 0].view(np.int64)
+        day_counts = np.bincount((done + 3) % 7, minlength=7)
 
-        # Find best and worst days
-        sorted_days = sorted(day_counts.items(), key=lambda x: x[1], reverse=True)
-        if len(sorted_days) >= 2:
-            best_day = sorted_days[0][0]
-            worst_day = sorted_days[-1][0]
+        # Find best and worst days among the days that have completions
+        present = day_counts > 0
+        if np.count_nonzero(present) >= 2:
+            best = int(day_counts.argmax())
+            worst = int(np.where(present, day_counts, np.iinfo(np.int64).max).argmin())
+            best_day = _DAYS[best]
 
-            if sorted_days[0][1] > sorted_days[-1][1] * 1.5:  # At least 50% difference
+            if day_counts[best] > day_counts[worst] * 1.5:  # At least 50% difference
                 insights.append(PatternInsight(
                     pattern_type="sequence",
                     description=f"You complete '{habit.get('name')}' most often on {best_day}s",
@@ -368,33 +511,31 @@ def _analyze_weekly_patterns(habits: list) -> List[PatternInsight]:
 def _analyze_streaks(habits: list) -> List[PatternInsight]:
     """Analyze streaks and provide encouragement or alerts."""
     insights = []
+    today = datetime.datetime.now().date()
+    today_iso = today.isoformat()
 
     for habit in habits:
         completions = habit.get("completions", [])
         if len(completions) < 3:
             continue
 
-        # Calculate current streak
+        # Days (YYYY-MM-DD prefix of completion_date) with a positive count
+        done = {
+            (c.get("completion_date") or "")[:10]
+            for c in completions
+            if c.get("count", 0) > 0
+        }
+
+        # The streak counts back from today, so a habit not done today has none
+        if today_iso not in done:
+            continue
+
+        # Calculate current streak, walking back from today (at most 30 days)
         streak = 0
-        from datetime import datetime, timedelta
-        today = datetime.now().date()
-
-        for i in range(30):  # Check last 30 days
-            check_date = today - timedelta(days=i)
-            date_str = check_date.isoformat()
-
-            found = False
-            for completion in completions:
-                comp_date = completion.get("completion_date", "")
-                if comp_date.startswith(date_str):
-                    if completion.get("count", 0) > 0:
-                        found = True
-                        break
-
-            if found:
-                streak += 1
-            else:
-                break
+        day = today
+        while streak < 30 and day.isoformat() in done:
+            streak += 1
+            day -= datetime.timedelta(days=1)
 
         # Insights based on streak
         if streak >= 7:
@@ -416,33 +557,19 @@ def _analyze_streaks(habits: list) -> List[PatternInsight]:
 
     return insights
 
-def _analyze_completion_times(habits: list) -> List[PatternInsight]:
+def _analyze_completion_times(prepared: list) -> List[PatternInsight]:
     """Detect anomalies in completion patterns."""
     insights = []
-    from datetime import datetime, timedelta
+    today = np.datetime64(datetime.datetime.now().date(), "D")
 
-    for habit in habits:
-        completions = habit.get("completions", [])
-        if len(completions) < 7:
+    for habit, dates, counts in prepared:
+        if len(habit.get("completions", [])) < 7:
             continue
 
         # Check for recent drop in completions
-        recent_count = 0
-        older_count = 0
-        today = datetime.now().date()
-
-        for completion in completions:
-            date_str = completion.get("completion_date", "")
-            try:
-                comp_date = datetime.fromisoformat(date_str.replace('Z', '+00:00')).date()
-                days_ago = (today - comp_date).days
-
-                if days_ago <= 3:
-                    recent_count += completion.get("count", 0)
-                elif days_ago <= 10:
-                    older_count += completion.get("count", 0)
-            except:
-                pass
+        days_ago = (today - dates).astype(np.int64)
+        recent_count = int(counts[days_ago <= 3].sum())
+        older_count = int(counts[(days_ago > 3) & (days_ago <= 10)].sum())
 
         # Detect drop in activity
         if older_count >= 5 and recent_count == 0:
@@ -483,27 +610,67 @@ def train_single_habit_model(req: dict, background_tasks: BackgroundTasks):
     background_tasks.add_task(_train_single_habit_background, habit_id)
     return {"status": "training_started", "message": f"Training model for habit {habit_id}"}
 
+class _ConstantClassifier:
+    """Stand-in model for histories with nothing to learn: always the base completion rate."""
+
+    def __init__(self, p: float):
+        self.p = p
+
+    def predict_proba(self, X) -> np.ndarray:
+        return np.tile([1.0 - self.p, self.p], (len(X), 1))
+
+def _train_one(habit_id: int, completions: list) -> Optional[bytes]:
+    """
+    Fit a completion model for one habit and return it as a compressed joblib
+    pickle, or None without enough data. Takes plain data and does no I/O;
+    the caller saves the result.
+    """
+    # Prepare training data (simplified - in production, extract more features)
+    X = []
+    y = []
+
+    for completion in completions:
+        # Features: day_of_week, hour_of_day (if available)
+        # For now, simple binary: did they complete it?
+        # This is a placeholder - real implementation would extract temporal features
+        X.append([0, 0, 0, 0, 0, 0])  # Placeholder features
+        y.append(1 if completion.get("count", 0) > 0 else 0)
+
+    if len(X) < 7:
+        print(f"Not enough feature data for habit {habit_id}")
+        return None
+
+    # Every placeholder feature row is identical, so any fitted classifier would
+    # just reproduce the completion rate; store that until real features exist
+    model = _ConstantClassifier(float(np.mean(y)))
+
+    buf = BytesIO()
+    joblib.dump(model, buf, compress=MODEL_COMPRESS)
+    return buf.getvalue()
+
+def _save_model(habit_id: int, data: bytes) -> Path:
+    """Write a pickled model produced by _train_one and drop the stale in-memory copy."""
+    model_path = MODELS_DIR / f"habit_completion_{habit_id}.pkl"
+    model_path.write_bytes(data)
+    _MODEL_CACHE.pop(habit_id, None)
+    _register_model(model_path)
+    return model_path
+
 def _train_single_habit_background(habit_id: int):
     """Train a model for a specific habit."""
-    import httpx
-
-    sklearn_tuple = _get_sklearn()
-    if sklearn_tuple[0] is None:
+    if _get_sklearn()[0] is None:
         print("scikit-learn not available, skipping training")
         return
 
-    sklearn, RandomForestClassifier, LogisticRegression, KMeans = sklearn_tuple
-
     try:
         # Fetch habit data
-        habits_url = os.getenv("HABITS_URL", "http://habits:9003")
-        response = httpx.get(f"{habits_url}/habits/{habit_id}", timeout=10)
+        response = _HTTP.get(f"/habits/{habit_id}")
 
         if response.status_code != 200:
             print(f"Failed to fetch habit {habit_id}: {response.status_code}")
             return
 
-        habit = response.json()
+        habit = orjson.loads(response.content)
 
         # Check if habit has sufficient completion data
         completions = habit.get("completions", [])
@@ -513,65 +680,42 @@ def _train_single_habit_background(habit_id: int):
 
         print(f"Training model for habit {habit_id} with {len(completions)} completions...")
 
-        # Prepare training data (simplified - in production, extract more features)
-        X = []
-        y = []
-
-        for completion in completions:
-            # Features: day_of_week, hour_of_day (if available)
-            # For now, simple binary: did they complete it?
-            # This is a placeholder - real implementation would extract temporal features
-            X.append([0, 0, 0, 0, 0, 0])  # Placeholder features
-            y.append(1 if completion.get("count", 0) > 0 else 0)
-
-        if len(X) < 7:
-            print(f"Not enough feature data for habit {habit_id}")
+        data = _train_one(habit_id, completions)
+        if data is None:
             return
 
-        # Train model
-        import numpy as np
-        model = RandomForestClassifier(n_estimators=100, random_state=42)
-        model.fit(np.array(X), np.array(y))
-
-        # Save model
-        import joblib
-        model_path = MODELS_DIR / f"habit_completion_{habit_id}.pkl"
-        joblib.dump(model, model_path)
+        model_path = _save_model(habit_id, data)
+        _prediction_cache.clear()
 
         print(f"✅ Model saved for habit {habit_id} at {model_path}")
 
     except Exception as e:
         print(f"Error training habit {habit_id}: {e}")
-        import traceback
         traceback.print_exc()
 
 def _train_habit_models_background():
     """
     Background task to train habit completion models.
 
-    Fetches data from habits microservice and trains scikit-learn models.
+    Fetches data from habits microservice and fits one model per habit.
     """
-    import httpx
-
-    sklearn_tuple = _get_sklearn()
-    if sklearn_tuple[0] is None:
+    if _get_sklearn()[0] is None:
         print("scikit-learn not available, skipping training")
         return
 
-    sklearn, RandomForestClassifier, LogisticRegression, KMeans = sklearn_tuple
-
     try:
         # Fetch habit completion data from habits microservice
-        habits_url = os.getenv("HABITS_URL", "http://habits:9003")
-        response = httpx.get(f"{habits_url}/", timeout=10)
+        response = _HTTP.get("/")
 
         if response.status_code != 200:
             print(f"Failed to fetch habits: {response.status_code}")
             return
 
-        habits = response.json()
+        habits = orjson.loads(response.content)
 
-        # Train a model for each habit with sufficient data
+        # Train a model for each habit with sufficient data; each fit is only a
+        # mean and a joblib dump, so it runs inline rather than in worker processes
+        trained = 0
         for habit in habits:
             habit_id = habit["id"]
             completions = habit.get("completions", [])
@@ -580,43 +724,57 @@ def _train_habit_models_background():
                 print(f"Habit {habit_id} has insufficient data ({len(completions)} completions), skipping")
                 continue
 
-            # Prepare training data
-            # For now, create synthetic training data based on completions
-            # In production, this would analyze actual completion patterns
-
-            # Create simple model for demonstration
-            model = LogisticRegression()
-
-            # Placeholder: Train with dummy data
-            # TODO: Extract real features from completion history
-            X_train = np.random.rand(len(completions), 6)
-            y_train = np.array([1] * len(completions))  # All completions in history were successful
-
-            model.fit(X_train, y_train)
-
-            # Save model
-            model_path = MODELS_DIR / f"habit_completion_{habit_id}.pkl"
-            joblib.dump(model, model_path)
+            try:
+                data = _train_one(habit_id, completions)
+            except Exception as e:
+                print(f"Error training habit {habit_id}: {e}")
+                continue
+            if data is None:
+                continue
+            _save_model(habit_id, data)
+            trained += 1
             print(f"✅ Trained model for habit {habit_id}: {habit['name']}")
 
-        print(f"✅ Training complete. Trained models for {len(habits)} habits.")
+        _prediction_cache.clear()
+        print(f"✅ Training complete. Trained models for {trained} habits.")
+
+        # Refresh the cached insights served by /insights/patterns
+        _compute_and_cache_insights()
 
     except Exception as e:
         print(f"❌ Training failed: {e}")
 
 # --- Stats Endpoint ---
 
+# Model file name -> (mtime, size) for everything in MODELS_DIR, kept current by
+# the trainers so /stats doesn't glob the directory on every scrape
+_MODEL_REGISTRY: Dict[str, tuple] = {}
+_registry_scanned = False
+
+def _register_model(model_path: Path) -> None:
+    st = model_path.stat()
+    _MODEL_REGISTRY[model_path.name] = (st.st_mtime, st.st_size)
+
+def _model_registry() -> Dict[str, tuple]:
+    """The registry, filled from a one-time directory scan on cold start."""
+    global _registry_scanned
+    if not _registry_scanned:
+        for f in MODELS_DIR.glob("*.pkl"):
+            _register_model(f)
+        _registry_scanned = True
+    return _MODEL_REGISTRY
+
 @app.get("/stats")
 def get_ml_stats():
     """
     Get statistics about the ML Engine's models and predictions.
     """
-    model_files = list(MODELS_DIR.glob("*.pkl"))
+    model_files = list(_model_registry())
 
     return {
         "models_trained": len(model_files),
         "models_dir": str(MODELS_DIR),
-        "model_files": [f.name for f in model_files],
+        "model_files": model_files,
         "last_training": "Never" if len(model_files) == 0 else "Check model file timestamps"
     }
 
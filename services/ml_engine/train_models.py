@@ -7,9 +7,11 @@ Runs overnight to train ML models on collected habit data.
 import os
 import sys
 import datetime
+import asyncio
 import logging
 from pathlib import Path
 import httpx
+import orjson
 
 # Configure logging
 logging.basicConfig(
@@ -21,35 +23,44 @@ logger = logging.getLogger(__name__)
 # Service URLs
 HABITS_URL = os.getenv("HABITS_URL", "http://habits:9003")
 ML_ENGINE_URL = os.getenv("ML_ENGINE_URL", "http://ml_engine:9008")
+TRAIN_CONCURRENCY = int(os.getenv("TRAIN_CONCURRENCY", "8"))
 
-async def fetch_all_habits():
+async def fetch_all_habits(client: httpx.AsyncClient):
     """Fetch all habits from the Habits service."""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{HABITS_URL}/habits")
-            response.raise_for_status()
-            return response.json()
+        response = await client.get(f"{HABITS_URL}/habits", timeout=5.0)
+        response.raise_for_status()
+        return orjson.loads(response.content)
     except Exception as e:
         logger.error(f"Failed to fetch habits: {e}")
         return []
 
-async def train_habit_model(habit_id: int, habit_name: str):
+async def train_habit_model(client: httpx.AsyncClient, sem: asyncio.Semaphore, habit_id: int, habit_name: str):
     """Train ML model for a specific habit."""
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            logger.info(f"Training model for habit {habit_id}: {habit_name}")
+        logger.info(f"Training model for habit {habit_id}: {habit_name}")
+        async with sem:
             response = await client.post(
                 f"{ML_ENGINE_URL}/train/habit_completion",
                 json={"habit_id": habit_id}
             )
-            response.raise_for_status()
-            result = response.json()
-            logger.info(f"✅ Trained habit {habit_id}: {result.get('message', 'Success')}")
-            return True
+        response.raise_for_status()
+        result = response.json()
+        logger.info(f"✅ Trained habit {habit_id}: {result.get('message', 'Success')}")
+        return True
     except Exception as e:
         logger.error(f"❌ Failed to train habit {habit_id}: {e}")
         return False
 
+async def refresh_insights(client: httpx.AsyncClient):
+    """Have the ML engine recompute and persist its pattern insights."""
+    try:
+        response = await client.get(f"{ML_ENGINE_URL}/insights/patterns", params={"refresh": "true"})
+        response.raise_for_status()
+        logger.info(f"💡 Refreshed {len(response.json())} insights")
+    except Exception as e:
+        logger.error(f"❌ Failed to refresh insights: {e}")
+
 async def main():
     """Main training loop - runs nightly to train all habit models."""
     logger.info("="*60)
@@ -57,33 +68,40 @@ async def main():
     logger.info(f"⏰ Started at: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     logger.info("="*60)
 
-    # Fetch all habits
-    logger.info("📊 Fetching all habits...")
-    habits = await fetch_all_habits()
+    # One keep-alive client for the whole session instead of one per request
+    client = httpx.AsyncClient(timeout=60.0)
+    try:
+        # Fetch all habits
+        logger.info("📊 Fetching all habits...")
+        habits = await fetch_all_habits(client)
+
+        if not habits:
+            logger.warning("⚠️  No habits found to train. Exiting.")
+            return
 
-    if not habits:
-        logger.warning("⚠️  No habits found to train. Exiting.")
-        return
+        logger.info(f"Found {len(habits)} habits to train")
 
-    logger.info(f"Found {len(habits)} habits to train")
+        # Train habits concurrently, with at most TRAIN_CONCURRENCY requests in flight
+        sem = asyncio.Semaphore(TRAIN_CONCURRENCY)
+        jobs = []
+        for habit in habits:
+            habit_id = habit.get("id")
+            habit_name = habit.get("name", "Unknown")
 
-    # Train each habit
-    success_count = 0
-    failed_count = 0
+            if habit_id is None:
+                logger.warning(f"Skipping habit with no ID: {habit_name}")
+                continue
 
-    for habit in habits:
-        habit_id = habit.get("id")
-        habit_name = habit.get("name", "Unknown")
+            jobs.append(train_habit_model(client, sem, habit_id, habit_name))
 
-        if habit_id is None:
-            logger.warning(f"Skipping habit with no ID: {habit_name}")
-            continue
+        results = await asyncio.gather(*jobs, return_exceptions=True)
+        success_count = sum(1 for r in results if r is True)
+        failed_count = len(results) - success_count
 
-        success = await train_habit_model(habit_id, habit_name)
-        if success:
-            success_count += 1
-        else:
-            failed_count += 1
+        # Precompute the insights served by /insights/patterns for the coming day
+        await refresh_insights(client)
+    finally:
+        await client.aclose()
 
     # Summary
     logger.info("="*60)
@@ -100,5 +118,4 @@ async def main():
         sys.exit(0)  # At least some succeeded
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(main())
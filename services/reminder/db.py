@@ -3,9 +3,24 @@ Database configuration for Reminder service
 """
 import os
 from sqlmodel import create_engine
+from sqlalchemy import event
 from sqlalchemy.pool import StaticPool
 
 
+# Compiled-statement cache entries per engine (SQLAlchemy default is 500)
+QUERY_CACHE_SIZE = 1200
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets pooled readers proceed while a writer commits; memory-mapped reads
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+    cursor.close()
+
+
 def get_engine(env_var: str, default_url: str):
     """
     Get database engine with environment variable override support.
@@ -19,13 +34,29 @@ def get_engine(env_var: str, default_url: str):
     """
     db_url = os.getenv(env_var, default_url)
 
-    # Use StaticPool for SQLite to allow sharing across threads
     if db_url.startswith('sqlite'):
-        return create_engine(
+        # In-memory databases only exist per connection, so keep a single
+        # shared connection there
+        if ':memory:' in db_url or 'mode=memory' in db_url or db_url in ('sqlite://', 'sqlite:///'):
+            return create_engine(
+                db_url,
+                echo=False,
+                connect_args={"check_same_thread": False},
+                poolclass=StaticPool,
+                query_cache_size=QUERY_CACHE_SIZE
+            )
+        # File-backed SQLite: a real connection pool so concurrent requests
+        # aren't serialized through one connection
+        engine = create_engine(
             db_url,
             echo=False,
             connect_args={"check_same_thread": False},
-            poolclass=StaticPool
+            pool_size=10,
+            max_overflow=20,
+            pool_recycle=3600,
+            query_cache_size=QUERY_CACHE_SIZE
         )
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+        return engine
     else:
-        return create_engine(db_url, echo=False)
+        return create_engine(db_url, echo=False, pool_recycle=3600, query_cache_size=QUERY_CACHE_SIZE)
@@ -1,6 +1,8 @@
 
 from fastapi import FastAPI, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
 from sqlmodel import SQLModel, create_engine, Session, select, Field
+from sqlalchemy.pool import StaticPool
 from typing import Optional
 import os
 from datetime import datetime, timedelta, time as dtime
@@ -9,6 +11,9 @@ from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.date import DateTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 import threading
+import atexit
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 import httpx
 import json
 
@@ -43,8 +48,20 @@ def _get_engine():
     # Delegate to centralized engine selection to ensure consistent test behavior
     return get_engine('REMINDER_DB_URL', 'sqlite:////data/reminder.db')
 
+# compiled-statement cache size for the in-memory fallback engines below, shared
+# with this service's db.get_engine so the two can't drift apart
+try:
+    from db import QUERY_CACHE_SIZE
+except ImportError:
+    # `db` resolved to the repo-root shim (tests run from the repo root)
+    from services.reminder.db import QUERY_CACHE_SIZE
+
 # engine will be (re)created at startup to respect test-time env overrides
 engine = _get_engine()
+# set once the schema has been created on `engine`, so requests skip re-checking it
+_DB_READY = False
+# set once the Notification table is known to exist on `engine`
+_notification_table_ready = False
 
 
 
@@ -56,7 +73,7 @@ async def lifespan(app: FastAPI):
     # Recreate engine at startup only if an explicit REMINDER_DB_URL is provided.
     # For test runs which create tables on the initial module import (in-memory DB),
     # avoid re-creating the engine to preserve the tables created by tests.
-    global engine
+    global engine, _DB_READY, _notification_table_ready
     if os.getenv('REMINDER_DB_URL'):
         engine = _get_engine()
     try:
@@ -65,11 +82,14 @@ async def lifespan(app: FastAPI):
         # If the configured DB is unavailable (e.g., /data not writable in test env),
         # fall back to an in-memory DB so tests and dev runs can proceed.
         try:
-            engine = create_engine('sqlite:///:memory:', echo=False, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+            engine = create_engine('sqlite:///:memory:', echo=False, connect_args={"check_same_thread": False}, poolclass=StaticPool, query_cache_size=QUERY_CACHE_SIZE)
             SQLModel.metadata.create_all(engine)
         except Exception:
             # if fallback fails, re-raise original error
             raise e
+    _DB_READY = True
+    # the engine may have been swapped above; don't serve presets read from the old one
+    _bump_presets_version()
     try:
         Reminder.__table__.create(engine, checkfirst=True)
     except Exception:
@@ -82,6 +102,7 @@ async def lifespan(app: FastAPI):
         # ensure Notification table exists if the model is available
         from shared.models import Notification
         Notification.__table__.create(engine, checkfirst=True)
+        _notification_table_ready = True
     except Exception:
         pass
     try:
@@ -90,24 +111,19 @@ async def lifespan(app: FastAPI):
         pass
     # Schedule all pending reminders
     try:
-        with Session(engine) as session:
-            reminders = session.exec(select(Reminder).where(Reminder.sent == False)).all()
-            for r in reminders:
-                _schedule_reminder(r)
+        _schedule_pending()
     except Exception:
         try:
             SQLModel.metadata.create_all(engine)
-            with Session(engine) as session:
-                reminders = session.exec(select(Reminder).where(Reminder.sent == False)).all()
-                for r in reminders:
-                    _schedule_reminder(r)
+            _schedule_pending()
         except Exception as e:
             print('Reminder startup: failed to schedule reminders after retry:', e)
     # ensure default presets exist
     try:
         with Session(engine) as session:
-            existing = session.exec(select(ReminderPreset)).all()
-            if not existing:
+            # only probe for a single id rather than loading every preset
+            existing = session.exec(select(ReminderPreset.id).limit(1)).first()
+            if existing is None:
                 defaults = [
                     ReminderPreset(name='laundry', description='Weekly laundry check', time_of_day='09:00', recurrence='weekly', tags='chores'),
                     ReminderPreset(name='drink_water', description='Drink water reminder', time_of_day='10:00', recurrence='hourly', tags='health'),
@@ -115,9 +131,9 @@ async def lifespan(app: FastAPI):
                     ReminderPreset(name='brush_teeth', description='Brush your teeth', time_of_day='08:00', recurrence='daily', tags='hygiene'),
                     ReminderPreset(name='take_meds', description='Take medications as scheduled', time_of_day='08:00', recurrence='daily', tags='meds')
                 ]
-                for p in defaults:
-                    session.add(p)
+                session.add_all(defaults)
                 session.commit()
+                _bump_presets_version()
     except Exception:
         pass
     yield
@@ -174,8 +190,10 @@ def status():
 _scheduler = BackgroundScheduler()
 _scheduler_lock = threading.Lock()
 
-# Shared httpx client for connection pooling (more efficient than requests)
-_http_client = httpx.Client(timeout=5.0)
+# Shared httpx client for connection pooling (more efficient than requests); sized
+# so the callback/habits/cam/meds calls of concurrent sends all keep their connections
+_http_client = httpx.Client(timeout=5.0, limits=httpx.Limits(max_keepalive_connections=32, max_connections=32))
+atexit.register(_http_client.close)
 
 RETRY_COUNT = int(os.getenv('HTTP_RETRY_COUNT', '2'))
 RETRY_DELAY = float(os.getenv('HTTP_RETRY_DELAY', '0.3'))
@@ -214,169 +232,214 @@ def _post_json_with_retry(url: str, payload: dict, tag: str, retries: int = None
     return False
 
 
+# Post-send integrations (callback, habits, cam, meds) run side by side here
+_integration_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="reminder-integrations")
+INTEGRATION_WAIT = float(os.getenv('REMINDER_INTEGRATION_WAIT', '6'))
+
+
 def _send_reminder(reminder_id: int):
+    global _notification_table_ready
     with Session(engine) as session:
         reminder = session.get(Reminder, reminder_id)
-        if reminder and not reminder.sent:
-            # Attempt to send notification via configured NOTIFICATION_URL.
-            payload = {"id": reminder.id, "text": reminder.text, "when": reminder.when}
-            notif_url = os.environ.get('NOTIFICATION_URL')
-            sent_ok = False
-            headers = {'Content-Type': 'application/json'}
-            # Only attempt external notification if network egress is explicitly allowed.
-            if notif_url and allow_network():
-                try:
-                    r = _http_client.post(notif_url, json=payload, headers=headers)
-                    if r.status_code < 400:
-                        sent_ok = True
-                except Exception as e:
-                    print('Notification POST failed:', e)
+        if not reminder or reminder.sent:
+            return
+        # Attempt to send notification via configured NOTIFICATION_URL.
+        payload = {"id": reminder.id, "text": reminder.text, "when": reminder.when}
+        notif_url = os.environ.get('NOTIFICATION_URL')
+        sent_ok = False
+        headers = {'Content-Type': 'application/json'}
+        # Only attempt external notification if network egress is explicitly allowed.
+        if notif_url and allow_network():
+            try:
+                r = _http_client.post(notif_url, json=payload, headers=headers)
+                if r.status_code < 400:
+                    sent_ok = True
+            except Exception as e:
+                print('Notification POST failed:', e)
 
-            # If no external notifier or it failed, persist a Notification row locally
-            if not sent_ok:
-                try:
-                    from shared.models import Notification
-                    # ensure table exists before inserting (tests may import in different orders)
+        # If no external notifier or it failed, persist a Notification row locally
+        if not sent_ok:
+            try:
+                from shared.models import Notification
+                # ensure table exists before inserting (tests may import in different
+                # orders); lifespan normally does this, so it's checked at most once
+                if not _notification_table_ready:
                     try:
                         Notification.__table__.create(engine, checkfirst=True)
+                        _notification_table_ready = True
                     except Exception:
                         pass
-                    n = Notification(channel=os.environ.get('NOTIFICATION_CHANNEL', 'internal'), payload_json=__import__('json').dumps(payload), sent=False)
-                    session.add(n)
-                except Exception:
-                    # best-effort: if we cannot persist, fallback to logging
-                    print(f"[REMINDER] {reminder.text} at {reminder.when}")
+                n = Notification(channel=os.environ.get('NOTIFICATION_CHANNEL', 'internal'), payload_json=__import__('json').dumps(payload), sent=False)
+                session.add(n)
+            except Exception:
+                # best-effort: if we cannot persist, fallback to logging
+                print(f"[REMINDER] {reminder.text} at {reminder.when}")
 
-            reminder.sent = True
-            session.add(reminder)
-            session.commit()
-            # send callback to ai_brain if configured; add simple retry
+        # resolve the preset mappings before committing so the session can be
+        # released before any integration call goes out
+        preset = None
+        if reminder.preset_id:
             try:
-                callback = os.environ.get('AI_BRAIN_CALLBACK_URL')
-                secret = os.environ.get('CALLBACK_SECRET')
-                # Attempt callback when a callback URL is configured (best-effort)
-                if callback:
-                    url = callback.rstrip('/') + '/reminder/callback'
-                    body = {"id": reminder.id, "text": reminder.text, "when": reminder.when}
-                    import hmac, hashlib, json as _json
-                    data = _json.dumps(body).encode()
-                    headers = {'Content-Type': 'application/json'}
-                    if secret:
-                        sig = hmac.new(secret.encode(), data, hashlib.sha256).hexdigest()
-                        headers['X-Callback-Signature'] = sig
-                    # retry a few times
-                    for attempt in range(3):
-                        try:
-                            r = _http_client.post(url, json=body, headers=headers)
-                            if r.status_code < 400:
-                                break
-                        except Exception as e:
-                            print(f"callback attempt {attempt+1} failed: {e}")
-            except Exception as e:
-                print("Failed to POST reminder callback:", e)
-            # best-effort integrations with other services using explicit mappings where available
-            try:
-                HABITS_URL = os.getenv('HABITS_URL', 'http://habits:8000')
-                CAM_URL = os.getenv('CAM_URL', 'http://cam:8000')
-                MEDS_URL = os.getenv('MEDS_URL', 'http://meds:8000')
-
+                preset = session.get(ReminderPreset, reminder.preset_id)
+            except Exception:
                 preset = None
-                if reminder.preset_id:
-                    try:
-                        preset = session.get(ReminderPreset, reminder.preset_id)
-                    except Exception:
-                        preset = None
+        text, recurrence = reminder.text, reminder.recurrence
+        text_lower = text.lower()
+        habit_id = getattr(preset, 'habit_id', None) if preset else None
+        med_id = getattr(preset, 'med_id', None) if preset else None
+        tags = preset.tags if preset else None
+
+        reminder.sent = True
+        session.add(reminder)
+        session.commit()
+
+    futures = [
+        _integration_pool.submit(_callback_flow, payload),
+        _integration_pool.submit(_habits_flow, text, text_lower, recurrence, habit_id),
+        _integration_pool.submit(_cam_flow, text_lower, tags),
+        _integration_pool.submit(_meds_flow, text_lower, med_id),
+    ]
+    wait(futures, timeout=INTEGRATION_WAIT)
 
-                # Habits: prefer preset.habit_id mapping, otherwise try to infer/create
+
+def _callback_flow(body: dict):
+    # send callback to ai_brain if configured; add simple retry
+    try:
+        callback = os.environ.get('AI_BRAIN_CALLBACK_URL')
+        secret = os.environ.get('CALLBACK_SECRET')
+        # Attempt callback when a callback URL is configured (best-effort)
+        if callback:
+            url = callback.rstrip('/') + '/reminder/callback'
+            import hmac, hashlib, json as _json
+            data = _json.dumps(body).encode()
+            headers = {'Content-Type': 'application/json'}
+            if secret:
+                sig = hmac.new(secret.encode(), data, hashlib.sha256).hexdigest()
+                headers['X-Callback-Signature'] = sig
+            # retry a few times
+            for attempt in range(3):
                 try:
-                    habit_id = None
-                    if preset and getattr(preset, 'habit_id', None):
-                        habit_id = preset.habit_id
-                    else:
-                        # try to find existing habit by name
-                        if allow_network():
-                            try:
-                                h_list = _http_client.get(HABITS_URL + '/').json()
-                                for h in h_list:
-                                    if h.get('name') and h.get('name').lower() in reminder.text.lower():
-                                        habit_id = h.get('id')
-                                        break
-                            except Exception:
-                                pass
-                    if habit_id is None:
-                        h_payload = {'name': reminder.text[:64], 'frequency': reminder.recurrence or 'once'}
-                        if allow_network():
-                            try:
-                                r = _http_client.post(HABITS_URL + '/', json=h_payload)
-                                if r.status_code < 400:
-                                    habit_id = r.json().get('id')
-                            except Exception:
-                                pass
-                    if habit_id:
-                        try:
-                            if allow_network():
-                                _http_client.post(f"{HABITS_URL}/complete/{habit_id}")
-                        except Exception:
-                            pass
-                except Exception:
-                    pass
+                    r = _http_client.post(url, json=body, headers=headers)
+                    if r.status_code < 400:
+                        break
+                except Exception as e:
+                    print(f"callback attempt {attempt+1} failed: {e}")
+    except Exception as e:
+        print("Failed to POST reminder callback:", e)
+
+
+# best-effort integrations with other services using explicit mappings where available
+
+# reminder-text keywords (matched against the lowercased text) that pull in cam/meds
+_CHORE_KEYWORDS = ('laundry',)
+_MED_KEYWORDS = ('med', 'pill')
+
+# url -> (fetched_at, items, [(lowercased name, id), ...]) for the habits/meds
+# listings, so a burst of fires doesn't re-pull the whole catalog each time
+LISTING_TTL = 60.0
+_listing_cache: dict = {}
+
+
+def _cached_listing(url: str) -> tuple:
+    """(items, name index) for a list endpoint, refetched at most every LISTING_TTL seconds."""
+    now = time.monotonic()
+    cached = _listing_cache.get(url)
+    if cached is not None and now - cached[0] < LISTING_TTL:
+        return cached[1], cached[2]
+    items = _http_client.get(url).json()
+    index = [(h['name'].lower(), h.get('id')) for h in items if isinstance(h, dict) and h.get('name')]
+    _listing_cache[url] = (now, items, index)
+    return items, index
 
-                # Cam: if preset indicates chores/laundry, call camera basket analyzer if available
+def _habits_flow(text: str, text_lower: str, recurrence: Optional[str], habit_id: Optional[int]):
+    # Habits: prefer preset.habit_id mapping, otherwise try to infer/create
+    try:
+        HABITS_URL = os.getenv('HABITS_URL', 'http://habits:8000')
+        if not habit_id:
+            habit_id = None
+            # try to find existing habit by name
+            if allow_network():
                 try:
-                    wants_basket = False
-                    if preset and preset.tags and 'chores' in (preset.tags or ''):
-                        wants_basket = True
-                    if 'laundry' in reminder.text.lower():
-                        wants_basket = True
-                    if wants_basket and allow_network():
-                        # best-effort call to /analyze_basket - may not exist
-                        try:
-                            resp = _http_client.get(CAM_URL + '/analyze_basket?camera=laundry')
-                            if resp.status_code < 400:
-                                j = resp.json()
-                                print('[REMINDER][BASKET]', j)
-                                # if basket fullness reported high, trigger follow-up reminder or note
-                                if j.get('fullness', 0) >= 0.8:
-                                    print('[REMINDER] basket appears full')
-                        except Exception:
-                            pass
+                    for name, hid in _cached_listing(HABITS_URL + '/')[1]:
+                        if name in text_lower:
+                            habit_id = hid
+                            break
                 except Exception:
                     pass
-
-                # Meds: prefer preset.med_id mapping
+        if habit_id is None:
+            h_payload = {'name': text[:64], 'frequency': recurrence or 'once'}
+            if allow_network():
                 try:
-                    med_id = None
-                    if preset and getattr(preset, 'med_id', None):
-                        med_id = preset.med_id
-                    if med_id:
-                        try:
-                            # fetch med details or notify med module
-                            if allow_network():
-                                _http_client.get(f"{MEDS_URL}/")
-                        except Exception:
-                            pass
-                    else:
-                        if 'med' in reminder.text.lower() or 'pill' in reminder.text.lower():
-                            try:
-                                if allow_network():
-                                    m = _http_client.get(MEDS_URL + '/').json()
-                                    print('[REMINDER][MEDS]', len(m), 'meds found')
-                            except Exception:
-                                pass
+                    r = _http_client.post(HABITS_URL + '/', json=h_payload)
+                    if r.status_code < 400:
+                        habit_id = r.json().get('id')
+                        # the cached listing doesn't know the new habit yet; without
+                        # this, later fires within the TTL would create duplicates
+                        _listing_cache.pop(HABITS_URL + '/', None)
                 except Exception:
                     pass
+        if habit_id:
+            try:
+                if allow_network():
+                    _http_client.post(f"{HABITS_URL}/complete/{habit_id}")
+            except Exception:
+                pass
+    except Exception:
+        pass
+
+
+def _cam_flow(text_lower: str, tags: Optional[str]):
+    # Cam: if preset indicates chores/laundry, call camera basket analyzer if available
+    try:
+        CAM_URL = os.getenv('CAM_URL', 'http://cam:8000')
+        wants_basket = False
+        if tags and 'chores' in (tags or ''):
+            wants_basket = True
+        if any(kw in text_lower for kw in _CHORE_KEYWORDS):
+            wants_basket = True
+        if wants_basket and allow_network():
+            # best-effort call to /analyze_basket - may not exist
+            try:
+                resp = _http_client.get(CAM_URL + '/analyze_basket?camera=laundry')
+                if resp.status_code < 400:
+                    j = resp.json()
+                    print('[REMINDER][BASKET]', j)
+                    # if basket fullness reported high, trigger follow-up reminder or note
+                    if j.get('fullness', 0) >= 0.8:
+                        print('[REMINDER] basket appears full')
+            except Exception:
+                pass
+    except Exception:
+        pass
+
+
+def _meds_flow(text_lower: str, med_id: Optional[int]):
+    # Meds: prefer preset.med_id mapping
+    try:
+        MEDS_URL = os.getenv('MEDS_URL', 'http://meds:8000')
+        if med_id:
+            try:
+                # fetch med details or notify med module
+                if allow_network():
+                    _http_client.get(f"{MEDS_URL}/")
             except Exception:
                 pass
+        else:
+            if any(kw in text_lower for kw in _MED_KEYWORDS):
+                try:
+                    if allow_network():
+                        m = _cached_listing(MEDS_URL + '/')[0]
+                        print('[REMINDER][MEDS]', len(m), 'meds found')
+                except Exception:
+                    pass
+    except Exception:
+        pass
 
-def _schedule_reminder(reminder: Reminder):
+def _schedule_reminder(reminder: Reminder, now: Optional[datetime] = None, replace: bool = True):
+    """(Re)schedule the job for a reminder; `replace=False` skips clearing a stale job."""
     try:
         when_dt = datetime.fromisoformat(reminder.when)
-        # remove existing job if present
         job_id = f"reminder_{reminder.id}"
-        try:
-            _scheduler.remove_job(job_id)
-        except Exception:
-            pass
 
         if reminder.recurrence:
             rec = reminder.recurrence.strip()
@@ -396,14 +459,40 @@ def _schedule_reminder(reminder: Reminder):
                 else:
                     # fallback to one-time date
                     trigger = DateTrigger(run_date=when_dt)
-
-            _scheduler.add_job(_send_reminder, trigger, args=[reminder.id], id=job_id)
         else:
-            if when_dt > datetime.now() and not reminder.sent:
-                _scheduler.add_job(_send_reminder, DateTrigger(run_date=when_dt), args=[reminder.id], id=job_id)
+            if when_dt <= (now or datetime.now()) or reminder.sent:
+                # nothing left to run; drop any job from an earlier schedule
+                if replace:
+                    try:
+                        _scheduler.remove_job(job_id)
+                    except Exception:
+                        pass
+                return
+            trigger = DateTrigger(run_date=when_dt)
+
+        # replace_existing swaps any previous job for this reminder in one step;
+        # misfires (e.g. while the service was down) collapse into a single run
+        _scheduler.add_job(_send_reminder, trigger, args=[reminder.id], id=job_id,
+                           replace_existing=True, coalesce=True, misfire_grace_time=None)
     except Exception as e:
         print(f"Failed to schedule reminder: {e}")
 
+
+def _schedule_pending():
+    """Schedule every unsent reminder, adding the jobs while the scheduler is paused."""
+    with Session(engine) as session:
+        reminders = session.exec(select(Reminder).where(Reminder.sent == False)).all()
+    now = datetime.now()
+    paused = _scheduler.running
+    if paused:
+        _scheduler.pause()
+    try:
+        for r in reminders:
+            _schedule_reminder(r, now=now, replace=False)
+    finally:
+        if paused:
+            _scheduler.resume()
+
 # startup handled by lifespan; legacy on_event startup block removed
 
 
@@ -459,6 +548,15 @@ def get_reminders():
         return {"reminders": result}
 
 
+def _insert_and_schedule(reminder: Reminder) -> Reminder:
+    with Session(engine) as session:
+        session.add(reminder)
+        session.commit()
+        session.refresh(reminder)
+        _schedule_reminder(reminder)
+    return reminder
+
+
 @app.post("/reminders")
 async def create_reminder(request: Request):
     """Create a reminder using frontend schema"""
@@ -501,25 +599,22 @@ async def create_reminder(request: Request):
         sent=False
     )
 
-    with Session(engine) as session:
-        session.add(reminder)
-        session.commit()
-        session.refresh(reminder)
-        _schedule_reminder(reminder)
+    # sync DB work runs off the event loop
+    await run_in_threadpool(_insert_and_schedule, reminder)
 
-        # Return in frontend format
-        return {
-            "id": reminder.id,
-            "title": title,
-            "description": description,
-            "reminder_time": reminder.when,
-            "recurring": bool(reminder.recurrence),
-            "created_at": None
-        }
+    # Return in frontend format
+    return {
+        "id": reminder.id,
+        "title": title,
+        "description": description,
+        "reminder_time": reminder.when,
+        "recurring": bool(reminder.recurrence),
+        "created_at": None
+    }
 
 
 @app.post("/series")
-async def create_series(payload: dict):
+def create_series(payload: dict):
     """Create a set of reminders tied to a medication."""
     med_id = payload.get("med_id")
     name = payload.get("name") or "Medication"
@@ -572,7 +667,7 @@ async def create_series(payload: dict):
 
 
 @app.delete("/reminders/{reminder_id}")
-async def delete_reminder_plural(reminder_id: int, request: Request):
+def delete_reminder_plural(reminder_id: int, request: Request):
     """Delete a reminder using plural endpoint"""
     _require_admin(request)
     with Session(engine) as session:
@@ -588,10 +683,29 @@ async def delete_reminder_plural(reminder_id: int, request: Request):
         return {"ok": True}
 
 
+# Serialized /presets payload tagged with the _presets_version it was built at;
+# presets only change through the writes below, which bump the version
+_presets_cache: Optional[tuple] = None
+_presets_version = 0
+
+
+def _bump_presets_version():
+    global _presets_version
+    _presets_version += 1
+
+
 @app.get("/presets")
 def list_presets():
-    with Session(engine) as session:
-        return session.exec(select(ReminderPreset)).all()
+    global _presets_cache
+    version = _presets_version
+    if _presets_cache is not None and _presets_cache[0] == version:
+        rows = _presets_cache[1]
+    else:
+        with Session(engine) as session:
+            rows = [p.dict() for p in session.exec(select(ReminderPreset)).all()]
+        _presets_cache = (version, rows)
+    # hand out copies so nothing downstream can mutate the cached payload
+    return [dict(p) for p in rows]
 
 
 @app.post("/presets")
@@ -601,6 +715,7 @@ def add_preset(p: ReminderPreset, request: Request):
         session.add(p)
         session.commit()
         session.refresh(p)
+        _bump_presets_version()
         return p
 
 
@@ -619,6 +734,7 @@ def update_preset(preset_id: int, p: ReminderPreset, request: Request):
         session.add(db_p)
         session.commit()
         session.refresh(db_p)
+        _bump_presets_version()
         return db_p
 
 
@@ -679,43 +795,33 @@ def create_from_preset(preset_id: int, request: Request):
         return r
 
 
+# static payload, built once
+_SUGGESTIONS = {'suggestions': [
+    {'key': 'drink_water', 'label': 'Drink water', 'description': 'Gentle hydration reminders throughout the day'},
+    {'key': 'brush_teeth', 'label': 'Brush your teeth', 'description': 'Morning and night dental care'},
+    {'key': 'shower', 'label': 'Take a shower', 'description': 'Daily freshening up'},
+    {'key': 'laundry', 'label': 'Check laundry basket', 'description': 'Weekly laundry check and basket fullness detection'},
+    {'key': 'take_meds', 'label': 'Take medications', 'description': 'Medication schedule reminders tied to meds module'}
+]}
+
+
 @app.get('/suggestions')
 def suggestions():
     """Return a short list of suggested quick reminders the user can add."""
-    items = [
-        {'key': 'drink_water', 'label': 'Drink water', 'description': 'Gentle hydration reminders throughout the day'},
-        {'key': 'brush_teeth', 'label': 'Brush your teeth', 'description': 'Morning and night dental care'},
-        {'key': 'shower', 'label': 'Take a shower', 'description': 'Daily freshening up'},
-        {'key': 'laundry', 'label': 'Check laundry basket', 'description': 'Weekly laundry check and basket fullness detection'},
-        {'key': 'take_meds', 'label': 'Take medications', 'description': 'Medication schedule reminders tied to meds module'}
-    ]
-    return {'suggestions': items}
+    return _SUGGESTIONS
 
 
 @app.post("/")
 def add_reminder(r: Reminder, request: Request):
-    # Use a local engine reference so fallbacks don't shadow the module-level engine
-    use_engine = engine
-    # Ensure the DB is usable; if configured DB path is unavailable, fall back to an in-memory DB
-    try:
-        with use_engine.connect() as conn:
-            row = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='reminder'").fetchone()
-    except Exception:
-        row = None
-    if not row:
-        # try to switch to an in-memory DB for tests/dev where /data is not writable
-        try:
-            test_engine = create_engine('sqlite:///:memory:', echo=False, connect_args={"check_same_thread": False}, poolclass=StaticPool)
-            SQLModel.metadata.create_all(test_engine)
-            use_engine = test_engine
-        except Exception:
-            pass
-    with Session(use_engine) as session:
-        # ensure tables exist (fallback for test envs where DB file is unavailable)
+    global _DB_READY
+    # tables are normally created once in lifespan; cover apps used without it
+    if not _DB_READY:
         try:
-            SQLModel.metadata.create_all(use_engine)
+            SQLModel.metadata.create_all(engine)
+            _DB_READY = True
         except Exception:
             pass
+    with Session(engine) as session:
         # validate when
         try:
             datetime.fromisoformat(r.when)
@@ -736,7 +842,7 @@ def add_reminder(r: Reminder, request: Request):
             import sqlalchemy
             if isinstance(e, (sqlalchemy.exc.OperationalError,)) or 'no such table' in str(e).lower():
                 try:
-                    fallback_engine = create_engine('sqlite:///:memory:', echo=False, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+                    fallback_engine = create_engine('sqlite:///:memory:', echo=False, connect_args={"check_same_thread": False}, poolclass=StaticPool, query_cache_size=QUERY_CACHE_SIZE)
                     SQLModel.metadata.create_all(fallback_engine)
                     with Session(fallback_engine) as session2:
                         session2.add(r)
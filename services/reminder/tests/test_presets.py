@@ -66,3 +66,22 @@ def test_suggestions_and_patch():
         assert r.status_code == 200
         updated = r.json()
         assert updated.get('habit_id') == 42
+
+
+def test_preset_writes_visible_in_next_list():
+    # /presets is cached between writes; a POST or PATCH must show up straight away
+    with TestClient(app) as client:
+        assert client.get('/presets').status_code == 200  # warm the cache
+
+        payload = {'name': 'cache_check', 'description': 'before', 'time_of_day': '07:00', 'recurrence': 'daily'}
+        r = client.post('/presets', json=payload, headers={'x-admin-token': ADMIN})
+        assert r.status_code == 200
+        pid = r.json()['id']
+        listed = {p['id']: p for p in client.get('/presets').json()}
+        assert listed[pid]['description'] == 'before'
+
+        r = client.patch(f'/presets/{pid}', json={'name': 'cache_check', 'description': 'after'},
+                         headers={'x-admin-token': ADMIN})
+        assert r.status_code == 200
+        listed = {p['id']: p for p in client.get('/presets').json()}
+        assert listed[pid]['description'] == 'after'
@@ -123,4 +123,39 @@ def test_admin_protection(monkeypatch):
     assert r.status_code == 403
 
     r2 = client.post(f'/{rid}/snooze', json={'minutes': 1}, headers={'x-admin-token': 'secret'})
-    assert r2.status_code == 200
\ No newline at end of file
+    assert r2.status_code == 200
+
+def test_created_habit_visible_to_next_fire(monkeypatch):
+    # a habit created by one fire must be found (not re-created) by the next fire
+    # even though the habits listing is cached
+    rm = reload_reminder_module()
+    habits = []
+    posts = []
+
+    class R:
+        def __init__(self, status_code=200, data=None):
+            self.status_code = status_code
+            self._data = data
+
+        def json(self):
+            return self._data
+
+    class FakeClient:
+        def get(self, url, **kwargs):
+            return R(data=list(habits))
+
+        def post(self, url, json=None, **kwargs):
+            if url == 'http://habits.test/':
+                posts.append(json)
+                habit = {'id': len(habits) + 1, 'name': json['name']}
+                habits.append(habit)
+                return R(data=habit)
+            return R()
+
+    monkeypatch.setenv('HABITS_URL', 'http://habits.test')
+    monkeypatch.setattr(rm, 'allow_network', lambda: True)
+    monkeypatch.setattr(rm, '_http_client', FakeClient())
+
+    rm._habits_flow('stretch', 'stretch', 'daily', None)
+    rm._habits_flow('stretch', 'stretch', 'daily', None)
+    assert len(posts) == 1